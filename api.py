@@ -0,0 +1,164 @@
+"""Versioned JSON read API under /api/v1."""
+import hashlib
+import json
+from datetime import datetime
+
+from flask import Blueprint, abort, current_app, request
+from sqlalchemy import func
+
+from extensions import db
+from models import Artist, Show, Venue
+from pagination import keyset_page, page_args
+
+blueprint = Blueprint("api", __name__, url_prefix="/api/v1")
+
+VENUE_API_FIELDS = {
+    "id": Venue.id,
+    "name": Venue.name,
+    "city": Venue.city,
+    "state": Venue.state,
+    "address": Venue.address,
+    "phone": Venue.phone,
+    "genres": Venue.genres,
+    "image_link": Venue.image_link,
+    "website": Venue.website,
+    "facebook_link": Venue.facebook_link,
+    "seeking_talent": Venue.seeking_talent,
+    "seeking_description": Venue.seeking_description,
+    "past_shows_count": Venue.past_shows_count,
+    "upcoming_shows_count": Venue.upcoming_shows_count,
+}
+
+ARTIST_API_FIELDS = {
+    "id": Artist.id,
+    "name": Artist.name,
+    "city": Artist.city,
+    "state": Artist.state,
+    "phone": Artist.phone,
+    "genres": Artist.musicGenres,
+    "image_link": Artist.image_link,
+    "website": Artist.website,
+    "facebook_link": Artist.facebook_link,
+    "seeking_venue": Artist.seeking_venue,
+    "seeking_description": Artist.seeking_description,
+    "past_shows_count": Artist.past_shows_count,
+    "upcoming_shows_count": Artist.upcoming_shows_count,
+}
+
+SHOW_API_FIELDS = {
+    "id": Show.id,
+    "start_time": Show.start_time,
+    "venue_id": Show.venue_id,
+    "venue_name": Venue.name,
+    "artist_id": Show.artist_id,
+    "artist_name": Artist.name,
+    "artist_image_link": Artist.image_link,
+}
+
+
+def latest(*columns):
+    """Newest of several timestamp columns (SQLite spells greatest() as max())"""
+    if db.session.get_bind().dialect.name == "postgresql":
+        return func.greatest(*columns)
+    return func.max(*columns)
+
+
+def api_query(fields, modified=None, keys=("id",)):
+    """Selects the ?fields= columns (all by default) plus the pagination keys
+    and, given modified, a last_modified column. Returns the query and the
+    output field names"""
+    requested = request.args.get("fields")
+    names = requested.split(",") if requested else list(fields)
+    if any(name not in fields for name in names):
+        abort(400)
+    columns = {name: fields[name] for name in (*names, *keys)}
+    query = db.session.query(*(column.label(name) for name, column in columns.items()))
+    if modified is not None:
+        query = query.add_columns(modified.label("last_modified"))
+    return query, names
+
+
+def api_json(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(repr(value))
+
+
+def api_response(payload, lastModified=None):
+    """Compact JSON with a strong ETag (and Last-Modified when given),
+    answered with 304 when the client's copy is still current"""
+    body = json.dumps(payload, separators=(",", ":"), sort_keys=True, default=api_json)
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(hashlib.sha256(body.encode()).hexdigest())
+    if lastModified is not None:
+        response.last_modified = lastModified
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def api_list(query, names, keys):
+    page = keyset_page(query, keys, *page_args(request.args))
+    payload = {
+        "data": [{name: getattr(row, name) for name in names} for row in page.items],
+        "next": page.next_cursor,
+        "prev": page.prev_cursor,
+    }
+    # no Last-Modified: deleting a row, or an older one moving onto the page,
+    # changes the page without making its newest updated_at any newer. The
+    # ETag hashes the body, so it changes with any of them
+    return api_response(payload)
+
+
+def api_detail(query, names):
+    row = query.first()
+    if row is None:
+        abort(404)
+    return api_response({name: getattr(row, name) for name in names}, row.last_modified)
+
+
+@blueprint.route("/venues")
+def venues():
+    query, names = api_query(VENUE_API_FIELDS)
+    return api_list(query, names, [(Venue.id, False)])
+
+
+@blueprint.route("/venues/<int:venue_id>")
+def venue(venue_id):
+    query, names = api_query(VENUE_API_FIELDS, Venue.updated_at)
+    return api_detail(query.filter(Venue.id == venue_id), names)
+
+
+@blueprint.route("/artists")
+def artists():
+    query, names = api_query(ARTIST_API_FIELDS)
+    return api_list(query, names, [(Artist.id, False)])
+
+
+@blueprint.route("/artists/<int:artist_id>")
+def artist(artist_id):
+    query, names = api_query(ARTIST_API_FIELDS, Artist.updated_at)
+    return api_detail(query.filter(Artist.id == artist_id), names)
+
+
+def api_show_query(modified=None):
+    query, names = api_query(SHOW_API_FIELDS, modified, keys=("start_time", "id"))
+    query = query.select_from(Show).join(Venue, Show.venue_id == Venue.id)
+    return query.join(Artist, Show.artist_id == Artist.id), names
+
+
+@blueprint.route("/shows")
+def shows():
+    query, names = api_show_query()
+    for key in ("venue_id", "artist_id"):
+        if key in request.args:
+            query = query.filter(getattr(Show, key) == request.args.get(key, type=int))
+    return api_list(query, names, [(Show.start_time, False), (Show.id, False)])
+
+
+@blueprint.route("/shows/<int:show_id>")
+def show(show_id):
+    query, names = api_show_query(
+        latest(Show.updated_at, Venue.updated_at, Artist.updated_at)
+    )
+    return api_detail(query.filter(Show.id == show_id), names)
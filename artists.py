@@ -0,0 +1,235 @@
+"""Artist pages: listing, search, detail and the create/edit forms."""
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+
+from extensions import db, page_cache
+from genres import catalog
+from models import Artist, Show, show_count, upcoming_shows_filter
+from pagination import keyset_page, page_args
+from queries import artist_shows, genre_filter, show_partner_ids, split_shows, typeahead
+from search import match_count, search
+from streaming import stream_page, stream_rows, streaming
+from typeahead import NameIndex
+
+blueprint = Blueprint("artists", __name__)
+
+artist_names = NameIndex(lambda: db.session.query(Artist.id, Artist.name))
+
+
+@blueprint.record_once
+def configure(state):
+    artist_names.max_age = state.app.config["TYPEAHEAD_MAX_AGE"]
+
+
+#  Artists
+#  ----------------------------------------------------------------
+@blueprint.route("/artists")
+@page_cache.cached("artists", unless=streaming)
+def artists():
+    # TODO_DONE: replace with real data returned from querying the database
+    def mapArtist(artist):
+        return {"id": artist.id, "name": artist.name}
+
+    artists, genre = genre_filter(
+        db.session.query(Artist.id, Artist.name), Artist.musicGenres
+    )
+    genreCounts = catalog.counts("artists")
+    if streaming():
+        return stream_page(
+            "pages/artists.html",
+            artists=map(mapArtist, stream_rows(artists.order_by(Artist.id))),
+            page=None,
+            genre=genre,
+            genre_counts=genreCounts,
+        )
+    page = keyset_page(artists, [(Artist.id, False)], *page_args(request.args))
+    data = map(mapArtist, page.items)
+    return render_template(
+        "pages/artists.html",
+        artists=data,
+        page=page,
+        genre=genre,
+        genre_counts=genreCounts,
+    )
+
+
+@blueprint.route("/artists/search", methods=["POST"])
+def search_artists():
+    # TODO_DONE: implement search on artists with partial string search. Ensure it is case-insensitive.
+    # seach for "A" should return "Guns N Petals", "Matt Quevado", and "The Wild Sax Band".
+    # search for "band" should return "The Wild Sax Band".
+    class ArtistSearch:
+      def __init__(self, count, capped, data):
+          self.count = count
+          self.capped = capped
+          self.data = data
+    class ArtistSearchData:
+      def __init__(self, id, name, num_upcoming_shows):
+          self.id = id
+          self.name = name
+          self.num_upcoming_shows = num_upcoming_shows
+    def mapSearchVenue(venue):
+      return ArtistSearchData(venue.id, venue.name, venue.num_upcoming_shows)
+
+    searchTerm = request.form.get("search_term", "")
+    artists, keys = search(
+        db.session.query(
+            Artist.id,
+            Artist.name,
+            show_count(Artist, Show.artist_id, upcoming_shows_filter()).label(
+                "num_upcoming_shows"
+            ),
+        ),
+        Artist,
+        Artist.musicGenres,
+        searchTerm,
+    )
+    limit = current_app.config["SEARCH_RESULT_LIMIT"]
+    total = match_count(artists, limit).label("total")
+    page = keyset_page(
+        artists.add_columns(total), keys, *page_args(request.form), limit=limit
+    )
+    artists = page.items
+    count = artists[0].total if artists else 0
+    response = ArtistSearch(
+        min(count, limit), count > limit, list(map(mapSearchVenue, artists))
+    )
+    return render_template(
+        "pages/search_artists.html",
+        results=response,
+        search_term=request.form.get("search_term", ""),
+        page=page,
+    )
+
+
+@blueprint.route("/artists/typeahead")
+def typeahead_artists():
+    return typeahead(artist_names, ".show_artist", "artist_id")
+
+
+@blueprint.route("/artists/<int:artist_id>")
+@page_cache.cached("artist", "artist_id")
+def show_artist(artist_id):
+    # shows the artist page with the given artist_id
+    # TODO_DONE: replace with real artist data from the artist table, using artist_id
+    data = Artist.query.get_or_404(artist_id)
+    upcomingShow, pastShow, pastShowCount = split_shows(
+        artist_shows(artist_id), current_app.config["PAST_SHOWS_LIMIT"]
+    )
+    data = {
+        **data.__dict__,
+        "past_shows_count": pastShowCount,
+        "upcoming_shows_count": upcomingShow.__len__(),
+        "past_shows": pastShow,
+        "upcoming_shows": upcomingShow,
+    }
+    return render_template("pages/show_artist.html", artist=data)
+
+
+#  Update
+#  ----------------------------------------------------------------
+@blueprint.route("/artists/<int:artist_id>/edit", methods=["GET"])
+def edit_artist(artist_id):
+    from forms import ArtistForm
+
+    artist = Artist.query.get(artist_id)
+    form = ArtistForm(**artist.__dict__)
+    # TODO_DONE: populate form with fields from artist with ID <artist_id>
+    return render_template("forms/edit_artist.html", form=form, artist=artist)
+
+
+@blueprint.route("/artists/<int:artist_id>/edit", methods=["POST"])
+def edit_artist_submission(artist_id):
+    # TODO_DONE: take values from the form submitted, and update existing
+    # artist record with ID <artist_id> using the new attributes
+    from forms import ArtistForm
+
+    error = False
+    form_data = request.form.to_dict()
+    artist = Artist.query.get(artist_id)
+    try:
+        if "seeking_venue" in form_data.keys():
+            form_data["seeking_venue"] = (
+                True if form_data["seeking_venue"] == "y" else False
+            )
+        else:
+            form_data = {**form_data, "seeking_venue": False}
+        form_data["musicGenres"] = request.form.getlist("musicGenres")
+        form = ArtistForm(**form_data)
+        form.populate_obj(artist)
+        db.session.commit()
+        db.session.refresh(artist)
+    except:
+        error = True
+        db.session.rollback()
+        flash("An error occurred. Venue " + form_data["name"] + " could not be listed.")
+    finally:
+        db.session.close()
+    if error:
+        abort(500)
+    # the artist's name and image also appear on /shows and its venues' pages
+    page_cache.invalidate("artists")
+    page_cache.invalidate("shows")
+    page_cache.invalidate("artist", artist_id)
+    page_cache.invalidate("venue", *show_partner_ids(Show.artist_id, Show.venue_id, artist_id))
+    catalog.invalidate("artists")
+    artist_names.put(artist_id, artist.name)
+    return redirect(url_for(".show_artist", artist_id=artist_id))
+
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+
+@blueprint.route("/artists/create", methods=["GET"])
+def create_artist_form():
+    from forms import ArtistForm
+
+    form = ArtistForm()
+    return render_template("forms/new_artist.html", form=form)
+
+
+@blueprint.route("/artists/create", methods=["POST"])
+def create_artist_submission():
+    # called upon submitting the new artist listing form
+    # TODO_DONE: insert form data as a new Venue record in the db, instead
+    # TODO_DONE: modify data to be the data object returned from db insertion
+    error = False
+    form_data = request.form.to_dict()
+    try:
+        if "seeking_venue" in form_data.keys():
+            form_data["seeking_venue"] = (
+                True if form_data["seeking_venue"] == "y" else False
+            )
+        form_data["musicGenres"] = request.form.getlist("musicGenres")
+        artist = Artist(**form_data)
+        db.session.add(artist)
+        db.session.commit()
+        db.session.refresh(artist)
+    except:
+        error = True
+        db.session.rollback()
+        flash(
+            "An error occurred. Artist " + form_data["name"] + " could not be listed."
+        )
+    finally:
+        db.session.close()
+    if not error:
+        page_cache.invalidate("artists")
+        catalog.invalidate("artists")
+        artist_names.put(artist.id, artist.name)
+        flash("Artist " + form_data["name"] + " was successfully listed!")
+    else:
+        abort(500)
+    # on successful db insert, flash success
+    # TODO_DONE: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Artist ' + data.name + ' could not be listed.')
+    return render_template("pages/home.html")
@@ -0,0 +1,171 @@
+"""Fingerprinted, precompressed static assets.
+
+``flask fyyur build-assets`` copies every file under static/ to ASSETS_DIR
+with a hash of its content in the name (css/main.css becomes
+css/main.3f2a9c1d04be.css), points url() references in stylesheets at the
+hashed names, and writes a .gz copy (and a .br one when the ``brotli``
+package is installed) of each text file that compresses. manifest.json maps
+the original paths to the hashed ones.
+
+Templates link assets with ``asset_url("css/main.css")``. With a manifest
+that is /assets/<hashed name>, served in the best encoding the client accepts
+with a year-long immutable Cache-Control: a changed file gets a new URL, so a
+cached copy never needs revalidating. Without a manifest (in development,
+say) it is the plain /static URL. Hashed files of earlier builds are kept, so
+pages rendered before a deploy still find their assets.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+from flask import request, send_from_directory, url_for
+
+MANIFEST = "manifest.json"
+HASH_LENGTH = 12
+# binary formats (images, woff) are compressed already
+COMPRESSIBLE = (".css", ".js", ".map", ".svg", ".json", ".txt", ".eot", ".ttf", ".otf")
+CSS_URL = re.compile(r"""url\((['"]?)([^'")]+)\1\)""")
+ONE_YEAR = 365 * 24 * 60 * 60
+
+
+def fingerprint(path, content):
+    root, extension = posixpath.splitext(path)
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    return "%s.%s%s" % (root, digest, extension)
+
+
+def rewrite_css(path, content, assets):
+    """Points the relative url() references of the stylesheet at path to
+    the hashed names in assets"""
+    directory = posixpath.dirname(path)
+
+    def replace(match):
+        quote, target = match.groups()
+        if target.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        name, suffix = re.match(r"([^?#]*)(.*)", target).groups()
+        hashed = assets.get(posixpath.normpath(posixpath.join(directory, name)))
+        if hashed is None:
+            return match.group(0)
+        relative = posixpath.relpath(hashed, directory or ".")
+        return "url(%s%s%s%s)" % (quote, relative, suffix, quote)
+
+    return CSS_URL.sub(replace, content.decode("utf-8")).encode("utf-8")
+
+
+def encoders():
+    """(encoding, file suffix, compress function) for each available encoding"""
+    available = [("gzip", ".gz", lambda data: gzip.compress(data, 9, mtime=0))]
+    try:
+        import brotli
+    except ImportError:
+        return available
+    return [("br", ".br", lambda data: brotli.compress(data, quality=11))] + available
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(content)
+
+
+def build(source, target):
+    """Builds the fingerprinted copy of the source directory in target and
+    returns the new manifest"""
+    paths = []
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.relpath(os.path.join(root, name), source)
+            paths.append(path.replace(os.sep, "/"))
+    # stylesheets go last, so that what they reference is hashed already
+    paths.sort(key=lambda path: path.endswith(".css"))
+    assets, encoded = {}, {}
+    available = encoders()
+    for path in paths:
+        with open(os.path.join(source, path), "rb") as file:
+            content = file.read()
+        if path.endswith(".css"):
+            content = rewrite_css(path, content, assets)
+        hashed = fingerprint(path, content)
+        output = os.path.join(target, hashed)
+        write(output, content)
+        assets[path] = hashed
+        if not path.endswith(COMPRESSIBLE):
+            continue
+        for encoding, suffix, compress in available:
+            compressed = compress(content)
+            if len(compressed) < len(content):
+                write(output + suffix, compressed)
+                encoded.setdefault(hashed, []).append(encoding)
+    manifest = {"assets": assets, "encoded": encoded}
+    # a running app may read the manifest at any time; swap it in whole
+    partial = os.path.join(target, MANIFEST + ".tmp")
+    write(partial, json.dumps(manifest, indent=1, sort_keys=True).encode())
+    os.replace(partial, os.path.join(target, MANIFEST))
+    return manifest
+
+
+class Assets:
+    def __init__(self, app=None):
+        self.directory = None
+        self.assets = {}
+        self.encoded = {}
+        self.urls = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config["ASSETS_DIR"]
+        self.load()
+        app.add_url_rule("/assets/<path:filename>", "assets", self.send)
+        app.add_template_global(self.url, "asset_url")
+        app.extensions["assets"] = self
+
+    def load(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST)) as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            manifest = {}
+        self.assets = manifest.get("assets", {})
+        self.encoded = manifest.get("encoded", {})
+        self.urls = {}
+
+    def url(self, path):
+        """URL of the static file at path, hashed when it has been built"""
+        # layouts link a dozen assets on every page; build each URL once per
+        # mount point
+        key = (request.script_root, path)
+        url = self.urls.get(key)
+        if url is None:
+            hashed = self.assets.get(path)
+            if hashed is None:
+                url = url_for("static", filename=path)
+            else:
+                url = url_for("assets", filename=hashed)
+            self.urls[key] = url
+        return url
+
+    def send(self, filename):
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        encodings = self.encoded.get(filename, ())
+        chosen = next(
+            (name for name in encodings if request.accept_encodings[name]), None
+        )
+        suffix = {"br": ".br", "gzip": ".gz"}.get(chosen, "")
+        # raises NotFound for names that aren't in the build
+        response = send_from_directory(
+            self.directory, filename + suffix, mimetype=mimetype, max_age=ONE_YEAR
+        )
+        if chosen:
+            response.headers["Content-Encoding"] = chosen
+        if encodings:
+            response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
@@ -0,0 +1 @@
+"""Performance benchmarks for Fyyur. Run each module with ``python -m``."""
@@ -0,0 +1,72 @@
+"""Compares the ``datetime`` template filter against the original
+implementation.
+
+    python -m benchmarks.datetime_filter --shows 500 --renders 20
+
+Each render formats one show time per tile, like /shows does; the show
+times repeat across renders the way they do across page views.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import babel.dates
+import dateutil.parser
+
+from filters import cached_format, format_datetime
+
+
+def legacy_format(value, format="medium"):
+    # the filter app.py used before
+    date = dateutil.parser.parse(value) if isinstance(value, str) else value
+    if format == "full":
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == "medium":
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format, locale="en")
+
+
+def make_times(count, seed):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [start + timedelta(minutes=rng.randrange(525600)) for _ in range(count)]
+
+
+def timed(func, values, renders):
+    start = time.perf_counter()
+    for _ in range(renders):
+        for value in values:
+            func(value, "full")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shows", type=int, default=500)
+    parser.add_argument("--renders", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    times = make_times(args.shows, args.seed)
+    inputs = {"datetime": times, "ISO string": [str(value) for value in times]}
+    for value in times + inputs["ISO string"]:
+        assert format_datetime(value, "full") == legacy_format(value, "full")
+        assert format_datetime(value) == legacy_format(value)
+
+    calls = args.shows * args.renders
+    print("%d show times, %d renders (%d calls)" % (args.shows, args.renders, calls))
+    print("%12s %12s %12s %12s %9s" % ("input", "legacy (s)", "uncached (s)", "warm (s)", "speedup"))
+    for name, values in inputs.items():
+        legacy = timed(legacy_format, values, args.renders)
+        cached_format.cache_clear()
+        uncached = timed(format_datetime, values, 1) * args.renders
+        warm = timed(format_datetime, values, args.renders)
+        print(
+            "%12s %12.4f %12.4f %12.4f %8.1fx"
+            % (name, legacy, uncached, warm, legacy / warm)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Measures how long starting the app spends importing modules, with
+``python -X importtime``, and checks it against a stored baseline.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --save-baseline
+
+Each step is run --runs times in a fresh interpreter: importing app.py, and
+importing it and calling create_app(). The median import time of each is
+printed with the modules that cost the most, and relative to the time taken
+in the same runs to import Flask and SQLAlchemy alone. The run fails,
+exiting 1, when a module that should load on first use (babel, dateutil,
+wtforms) is imported at startup, or when a step's relative import time is
+more than --tolerance above the baseline's. Milliseconds depend on the
+machine, so the baseline only records the ratios.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(__file__), "import_baseline.json")
+# differences smaller than this are noise, whatever the tolerance
+NOISE_MS = 20.0
+
+# the framework the app is built on: its import time is the yardstick
+REFERENCE = "import flask, flask_sqlalchemy, sqlalchemy.orm"
+STEPS = {
+    "import": "import app",
+    "create_app": "import app; app.create_app()",
+}
+# imported by the views and filters that need them, not at startup
+LAZY = ("babel", "dateutil", "wtforms", "flask_wtf")
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def parse(output):
+    """{top-level module: cumulative ms} and the set of every imported module
+    from -X importtime output"""
+    top, everything = {}, set()
+    for line in output.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        everything.add(name)
+        if not indent:
+            top[name] = int(cumulative_us) / 1000
+    return top, everything
+
+
+def measure(code, env):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode:
+        sys.exit("%s failed:\n%s" % (code, result.stderr))
+    return parse(result.stderr)
+
+
+def run(runs, env):
+    # what the interpreter imports before running any code
+    startup, _ = measure("pass", env)
+    totals = {step: [] for step in STEPS}
+    modules = {step: {} for step in STEPS}
+    imported = {step: set() for step in STEPS}
+    references = []
+    # the steps and the reference take turns, so they share the machine's
+    # slow and fast moments
+    for _ in range(runs):
+        top, everything = measure(REFERENCE, env)
+        references.append(sum(ms for name, ms in top.items() if name not in startup))
+        for step, code in STEPS.items():
+            top, everything = measure(code, env)
+            top = {name: ms for name, ms in top.items() if name not in startup}
+            totals[step].append(sum(top.values()))
+            imported[step] |= everything
+            for name, ms in top.items():
+                modules[step].setdefault(name, []).append(ms)
+    reference = statistics.median(references)
+    results = {}
+    for step in STEPS:
+        heaviest = sorted(
+            (
+                (statistics.median(times), name)
+                for name, times in modules[step].items()
+            ),
+            reverse=True,
+        )
+        ms = statistics.median(totals[step])
+        results[step] = {
+            "ms": ms,
+            "ratio": ms / reference,
+            "reference": reference,
+            "heaviest": [[name, ms] for ms, name in heaviest[:8]],
+            "eager": sorted(
+                name for name in imported[step] if name.split(".")[0] in LAZY
+            ),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of results against baseline, as messages"""
+    problems = []
+    for step, result in results.items():
+        if result["eager"]:
+            roots = sorted({name.split(".")[0] for name in result["eager"]})
+            problems.append("%s: imports %s at startup" % (step, ", ".join(roots)))
+        before = baseline.get(step)
+        if before is None:
+            continue
+        # the import time the baseline's ratio predicts on this machine
+        expected = before["ratio"] * result["reference"]
+        limit = max(expected * (1 + tolerance), expected + NOISE_MS)
+        if result["ms"] > limit:
+            problems.append(
+                "%s: %.1f ms of imports, %.2fx the reference, baseline %.2fx "
+                "(%.1f ms here)"
+                % (step, result["ms"], result["ratio"], before["ratio"], expected)
+            )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown over the baseline, 0.25 = 25%%",
+    )
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="fyyur-imports-")
+    env = dict(os.environ, FYYUR_ENV="testing")
+    env.setdefault("LOG_FILE", os.path.join(scratch, "error.log"))
+    try:
+        results = run(args.runs, env)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    for step, result in results.items():
+        print(
+            "%-12s %8.1f ms %6.2fx the reference (%.1f ms)"
+            % (step, result["ms"], result["ratio"], result["reference"])
+        )
+        for name, ms in result["heaviest"]:
+            print("    %-28s %8.1f ms" % (name, ms))
+
+    if args.save_baseline and not compare(results, {}, args.tolerance):
+        with open(args.baseline, "w") as file:
+            saved = {
+                step: {"ratio": round(result["ratio"], 3)}
+                for step, result in results.items()
+            }
+            json.dump(saved, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print("Saved the baseline to %s" % args.baseline)
+        return
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    else:
+        print("No baseline at %s, only checking lazy imports" % args.baseline)
+    problems = compare(results, baseline, args.tolerance)
+    for problem in problems:
+        print("REGRESSION " + problem)
+    if problems:
+        sys.exit(1)
+    print("No regressions against %s" % args.baseline)
+
+
+if __name__ == "__main__":
+    main()
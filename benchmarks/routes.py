@@ -0,0 +1,339 @@
+"""Load-tests every route through the Flask test client and checks the
+numbers against a stored baseline.
+
+    python -m benchmarks.routes --shows 10000
+    python -m benchmarks.routes --shows 10000 --save-baseline
+
+Without DATABASE_URL this runs against an in-memory SQLite database seeded
+by benchmarks.seed. With it, the configured database is used, and seeding it
+(dropping every table first) also needs --reset. Each route is requested
+--requests times with the page cache off (--cache turns it on), in rounds
+that go through every route once. The p50/p95/p99 latency, the median CPU
+time of this process and the SQL statement count per request are printed,
+with each route's CPU time relative to that of the index page in the same
+run.
+
+The run fails, exiting 1, when a route runs more queries than in the
+baseline, or when its relative CPU time grew by more than LATENCY_TOLERANCE
+over the baseline's and that costs more than LATENCY_FLOOR_MS per request.
+Milliseconds differ from machine to machine, the ratios much less, so the
+baseline only records the ratios. CPU time is used because wall-clock time
+also counts the time other processes hold the CPU, which slows long requests
+more than short ones. It leaves out the time spent waiting for a database
+server, so only the in-memory SQLite run gates the cost of the queries.
+"""
+import os
+
+os.environ.setdefault("FYYUR_ENV", "testing")
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+from app import create_app
+from benchmarks import seed
+from cache import MemoryBackend, NullBackend
+from extensions import db
+from models import Show
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# CPU time is measured against this route, run in the same rounds
+REFERENCE = "index"
+# allowed growth of a route's CPU time relative to the reference's, and the
+# slowdown in milliseconds below which it is taken for noise
+LATENCY_TOLERANCE = 0.5
+LATENCY_FLOOR_MS = 1.0
+
+# endpoints left out, and why
+SKIPPED = {
+    "static": "serves files from disk",
+    "assets": "serves files from disk",
+    "venues.delete_venue": "deletes the seeded venues",
+}
+
+VENUE_FORM = {
+    "name": "Benchmark Venue",
+    "city": "City 1",
+    "state": "CA",
+    "address": "1 Main Street",
+    "phone": "555-555-5555",
+    "genres": ["Jazz", "Blues"],
+    "facebook_link": "https://www.facebook.com/benchmark",
+}
+ARTIST_FORM = {
+    "name": "Benchmark Artist",
+    "city": "City 1",
+    "state": "CA",
+    "phone": "555-555-5555",
+    "musicGenres": ["Jazz"],
+    "facebook_link": "https://www.facebook.com/benchmark",
+}
+
+
+def routes(venueId, artistId, showId):
+    """(endpoint, method, path, form data) for each benchmarked request"""
+    return [
+        ("index", "GET", "/", None),
+        ("venues.venues", "GET", "/venues", None),
+        ("venues.search_venues", "POST", "/venues/search", {"search_term": "hall"}),
+        ("venues.typeahead_venues", "GET", "/venues/typeahead?q=the+blu", None),
+        ("venues.show_venue", "GET", "/venues/%d" % venueId, None),
+        ("venues.create_venue_form", "GET", "/venues/create", None),
+        ("venues.create_venue_submission", "POST", "/venues/create", VENUE_FORM),
+        ("venues.edit_venue", "GET", "/venues/%d/edit" % venueId, None),
+        (
+            "venues.edit_venue_submission",
+            "POST",
+            "/venues/%d/edit" % venueId,
+            VENUE_FORM,
+        ),
+        ("artists.artists", "GET", "/artists", None),
+        (
+            "artists.search_artists",
+            "POST",
+            "/artists/search",
+            {"search_term": "band"},
+        ),
+        ("artists.typeahead_artists", "GET", "/artists/typeahead?q=blu", None),
+        ("artists.show_artist", "GET", "/artists/%d" % artistId, None),
+        ("artists.create_artist_form", "GET", "/artists/create", None),
+        (
+            "artists.create_artist_submission",
+            "POST",
+            "/artists/create",
+            ARTIST_FORM,
+        ),
+        ("artists.edit_artist", "GET", "/artists/%d/edit" % artistId, None),
+        (
+            "artists.edit_artist_submission",
+            "POST",
+            "/artists/%d/edit" % artistId,
+            ARTIST_FORM,
+        ),
+        ("shows.shows", "GET", "/shows", None),
+        ("shows.create_shows", "GET", "/shows/create", None),
+        (
+            "shows.create_show_submission",
+            "POST",
+            "/shows/create",
+            {
+                "venue_id": venueId,
+                "artist_id": artistId,
+                "start_time": "2030-01-01 20:00",
+            },
+        ),
+        ("api.venues", "GET", "/api/v1/venues", None),
+        ("api.venue", "GET", "/api/v1/venues/%d" % venueId, None),
+        ("api.artists", "GET", "/api/v1/artists", None),
+        ("api.artist", "GET", "/api/v1/artists/%d" % artistId, None),
+        ("api.shows", "GET", "/api/v1/shows", None),
+        ("api.show", "GET", "/api/v1/shows/%d" % showId, None),
+        ("metrics_endpoint", "GET", "/metrics", None),
+    ]
+
+
+def busiest(column):
+    """The id in column with the most shows, so detail pages aren't empty"""
+    row = (
+        db.session.query(column, db.func.count())
+        .group_by(column)
+        .order_by(db.func.count().desc(), column)
+        .first()
+    )
+    return row[0]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run(app, requests, warmup):
+    queries = {"count": 0}
+
+    def count(*args):
+        queries["count"] += 1
+
+    with app.app_context():
+        venueId = busiest(Show.venue_id)
+        artistId = busiest(Show.artist_id)
+        showId = db.session.query(db.func.min(Show.id)).scalar()
+    plan = routes(venueId, artistId, showId)
+    covered = {endpoint for endpoint, method, path, data in plan} | set(SKIPPED)
+    missing = {rule.endpoint for rule in app.url_map.iter_rules()} - covered
+    if missing:
+        sys.exit("Routes without a benchmark: %s" % ", ".join(sorted(missing)))
+
+    client = app.test_client()
+    timings = {endpoint: [] for endpoint, method, path, data in plan}
+    cpu = {endpoint: [] for endpoint, method, path, data in plan}
+    counts = {endpoint: [] for endpoint, method, path, data in plan}
+    event.listen(Engine, "before_cursor_execute", count)
+    try:
+        for attempt in range(warmup + requests):
+            for endpoint, method, path, data in plan:
+                queries["count"] = 0
+                started = time.perf_counter()
+                startedCpu = time.process_time()
+                response = client.open(path, method=method, data=data)
+                # streamed pages only run their queries as the body is read
+                response.get_data()
+                elapsed = time.perf_counter() - started
+                elapsedCpu = time.process_time() - startedCpu
+                if response.status_code >= 400:
+                    sys.exit("%s %s returned %d" % (method, path, response.status_code))
+                if attempt >= warmup:
+                    timings[endpoint].append(elapsed * 1000)
+                    cpu[endpoint].append(elapsedCpu * 1000)
+                    counts[endpoint].append(queries["count"])
+    finally:
+        event.remove(Engine, "before_cursor_execute", count)
+    results = {}
+    for endpoint, method, path, data in plan:
+        results[endpoint] = {
+            "p50": percentile(timings[endpoint], 0.50),
+            "p95": percentile(timings[endpoint], 0.95),
+            "p99": percentile(timings[endpoint], 0.99),
+            "cpu": statistics.median(cpu[endpoint]),
+            "queries": statistics.median(counts[endpoint]),
+        }
+    reference = results[REFERENCE]["cpu"]
+    for result in results.values():
+        result["ratio"] = result["cpu"] / reference
+    return results
+
+
+def compare(results, baseline):
+    """Query count and relative CPU time regressions of results against
+    baseline, as messages"""
+    problems = []
+    reference = results[REFERENCE]["cpu"]
+    for endpoint, result in sorted(results.items()):
+        before = baseline.get(endpoint)
+        if before is None:
+            continue
+        if result["queries"] > before["queries"]:
+            problems.append(
+                "%s: %g queries per request, baseline %g"
+                % (endpoint, result["queries"], before["queries"])
+            )
+        # the CPU time the baseline's ratio predicts on this machine
+        expected = before["ratio"] * reference
+        if (
+            result["ratio"] > before["ratio"] * (1 + LATENCY_TOLERANCE)
+            and result["cpu"] - expected > LATENCY_FLOOR_MS
+        ):
+            problems.append(
+                "%s: CPU time %.2f ms is %.2fx %s, baseline %.2fx (%.2f ms here)"
+                % (
+                    endpoint,
+                    result["cpu"],
+                    result["ratio"],
+                    REFERENCE,
+                    before["ratio"],
+                    expected,
+                )
+            )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shows", type=int, default=10000, help="0 uses existing data")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--reset", action="store_true", help="allow seeding DATABASE_URL"
+    )
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--cache", action="store_true", help="keep the page cache on")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    app = create_app()
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    # whatever the profile or environment, only a throwaway in-memory
+    # database is seeded without asking
+    if args.shows and uri != "sqlite://" and not args.reset:
+        parser.error(
+            "seeding drops the tables of %s, pass --reset to do it"
+            % make_url(uri).render_as_string(hide_password=True)
+        )
+    app.config["WTF_CSRF_ENABLED"] = False
+    app.config["SQL_SLOW_REQUEST_MS"] = None
+    page_cache = app.extensions["page_cache"]
+    page_cache.backend = MemoryBackend() if args.cache else NullBackend()
+    with app.app_context():
+        if args.shows:
+            db.drop_all()
+            db.create_all()
+            seed.seed(args.shows, seed=args.seed)
+
+    results = run(app, args.requests, args.warmup)
+    print(
+        "%-34s %9s %9s %9s %9s %9s %8s"
+        % (
+            "endpoint",
+            "p50 ms",
+            "p95 ms",
+            "p99 ms",
+            "cpu ms",
+            "x " + REFERENCE,
+            "queries",
+        )
+    )
+    for endpoint, result in results.items():
+        print(
+            "%-34s %9.2f %9.2f %9.2f %9.2f %9.2f %8g"
+            % (
+                endpoint,
+                result["p50"],
+                result["p95"],
+                result["p99"],
+                result["cpu"],
+                result["ratio"],
+                result["queries"],
+            )
+        )
+
+    scale = {"shows": args.shows, "seed": args.seed, "cache": args.cache}
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            recorded = {
+                endpoint: {
+                    "queries": result["queries"],
+                    "ratio": round(result["ratio"], 3),
+                }
+                for endpoint, result in results.items()
+            }
+            json.dump(dict(scale, routes=recorded), file, indent=2, sort_keys=True)
+            file.write("\n")
+        print("Saved the baseline to %s" % args.baseline)
+        return
+    if not os.path.exists(args.baseline):
+        print("No baseline at %s, nothing to compare" % args.baseline)
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if any(baseline.get(key) != value for key, value in scale.items()):
+        sys.exit(
+            "The baseline was recorded with --shows %(shows)s --seed %(seed)s "
+            "and cache=%(cache)s, rerun with those settings" % baseline
+        )
+    problems = compare(results, baseline["routes"])
+    for problem in problems:
+        print("REGRESSION " + problem)
+    if problems:
+        sys.exit(1)
+    print("No regressions against %s" % args.baseline)
+
+
+if __name__ == "__main__":
+    main()
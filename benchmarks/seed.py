@@ -0,0 +1,158 @@
+"""Fills the database with deterministic synthetic venues, artists and shows.
+
+    python -m benchmarks.seed --shows 100000 --reset
+
+The same --seed and --shows always give the same rows. Show times are spread
+over a year either side of --anchor (today by default), so about half are
+upcoming. There is one venue per 20 shows and one artist per 10 unless
+--venues / --artists say otherwise. --reset drops and recreates the tables
+of the configured database first; without it the tables must be empty.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, time as clock, timedelta, timezone
+
+from app import create_app
+from bulk import bulk_insert, chunks
+from extensions import db
+from forms import VenueForm
+from genres import DEFAULTS as GENRES
+from models import Artist, Show, Venue, refresh_show_counters
+
+STATES = [value for value, label in VenueForm.state.kwargs["choices"]]
+WORDS = (
+    "Blue Red Golden Silver Velvet Electric Midnight Urban Wild Lucky Crystal "
+    "Rusty Neon Hidden Royal Sonic Lunar Copper Echo Little"
+).split()
+NOUNS = (
+    "Room Hall Lounge Club Garden Tavern Cellar Stage Factory Barn Theater "
+    "Loft Arms Dock Hop Owl Fox Tiger Band Collective"
+).split()
+
+VENUE_COLUMNS = (
+    "name", "city", "state", "address", "phone", "genres", "image_link",
+    "website", "facebook_link", "seeking_talent", "seeking_description",
+)
+ARTIST_COLUMNS = (
+    "name", "city", "state", "phone", "musicGenres", "image_link", "website",
+    "facebook_link", "seeking_venue", "seeking_description",
+)
+SHOW_COLUMNS = ("venue_id", "artist_id", "start_time")
+
+
+def place(rng, cities):
+    number = rng.randrange(cities)
+    return "City %d" % number, STATES[number % len(STATES)]
+
+
+def phone(rng, number):
+    return "%03d-%03d-%04d" % (rng.randrange(1000), rng.randrange(1000), number % 10000)
+
+
+def phrase(rng, number):
+    return "%s %s %d" % (rng.choice(WORDS), rng.choice(NOUNS), number)
+
+
+def venue_rows(rng, count, cities):
+    for number in range(1, count + 1):
+        city, state = place(rng, cities)
+        seeking = rng.random() < 0.3
+        yield (
+            "The " + phrase(rng, number),
+            city,
+            state,
+            "%d Main Street" % rng.randrange(1, 9999),
+            phone(rng, number),
+            rng.sample(GENRES, rng.randint(1, 3)),
+            "https://images.example.com/venues/%d.jpg" % number,
+            "https://venue%d.example.com" % number,
+            "https://www.facebook.com/venue%d" % number,
+            seeking,
+            "Looking for local acts" if seeking else None,
+        )
+
+
+def artist_rows(rng, count, cities):
+    for number in range(1, count + 1):
+        city, state = place(rng, cities)
+        seeking = rng.random() < 0.3
+        yield (
+            phrase(rng, number),
+            city,
+            state,
+            phone(rng, number),
+            rng.sample(GENRES, rng.randint(1, 2)),
+            "https://images.example.com/artists/%d.jpg" % number,
+            "https://artist%d.example.com" % number,
+            "https://www.facebook.com/artist%d" % number,
+            seeking,
+            "Looking for shows" if seeking else None,
+        )
+
+
+def show_rows(rng, count, venueIds, artistIds, anchor):
+    for _ in range(count):
+        offset = timedelta(days=rng.uniform(-365, 365))
+        startTime = (anchor + offset).replace(second=0, microsecond=0)
+        yield rng.choice(venueIds), rng.choice(artistIds), startTime
+
+
+def load(model, columns, rows, batch):
+    count = 0
+    for chunk in chunks(rows, batch):
+        bulk_insert(db.session.connection(), model.__table__, columns, chunk)
+        db.session.commit()
+        count += len(chunk)
+    return count
+
+
+def seed(shows, venues=None, artists=None, seed=1, anchor=None, batch=10000):
+    """Inserts the synthetic data set; call inside an app context"""
+    venues = venues or max(10, shows // 20)
+    artists = artists or max(10, shows // 10)
+    if anchor is None:
+        today = datetime.now(timezone.utc).date()
+        anchor = datetime.combine(today, clock(20), timezone.utc)
+    rng = random.Random(seed)
+    cities = max(5, venues // 25)
+    load(Venue, VENUE_COLUMNS, venue_rows(rng, venues, cities), batch)
+    load(Artist, ARTIST_COLUMNS, artist_rows(rng, artists, cities), batch)
+    venueIds = [id for (id,) in db.session.query(Venue.id).order_by(Venue.id)]
+    artistIds = [id for (id,) in db.session.query(Artist.id).order_by(Artist.id)]
+    load(Show, SHOW_COLUMNS, show_rows(rng, shows, venueIds, artistIds, anchor), batch)
+    refresh_show_counters(Venue, Show.venue_id)
+    refresh_show_counters(Artist, Show.artist_id)
+    db.session.commit()
+    return venues, artists, shows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shows", type=int, default=10000)
+    parser.add_argument("--venues", type=int)
+    parser.add_argument("--artists", type=int)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--anchor", type=datetime.fromisoformat, help="ISO date time")
+    parser.add_argument("--reset", action="store_true")
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+        empty = not db.session.query(Venue.id).first()
+        if not args.reset and not empty:
+            parser.error("the database already has data, pass --reset to replace it")
+        started = time.perf_counter()
+        venues, artists, shows = seed(
+            args.shows, args.venues, args.artists, args.seed, args.anchor
+        )
+        print(
+            "Seeded %d venues, %d artists and %d shows in %.1fs"
+            % (venues, artists, shows, time.perf_counter() - started)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Compares request throughput of the development launcher (``python app.py``,
+the Werkzeug server in debug mode) with gunicorn serving wsgi.py.
+
+    python -m benchmarks.serve --shows 10000 --seconds 10 --concurrency 16
+
+Both servers run against the same database: DATABASE_URL if set, otherwise
+a SQLite file in a temporary directory that is seeded first (seeding
+DATABASE_URL drops its tables and needs --reset). The page cache is off
+unless --cache is given. Clients keep their connections open and cycle
+through the listing and detail pages for --seconds; requests per second and
+latency percentiles are printed per server.
+"""
+import argparse
+import http.client
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ["/", "/venues", "/artists", "/shows", "/venues/1", "/artists/1"]
+
+
+def launchers(port):
+    """(name, command, FYYUR_ENV, port) for each server under test"""
+    dev = [sys.executable, "app.py"]
+    prod = [
+        "gunicorn",
+        "-c",
+        "gunicorn.conf.py",
+        "--bind",
+        "127.0.0.1:%d" % port,
+        "--access-logfile",
+        "/dev/null",
+        "wsgi:app",
+    ]
+    # app.run() always listens on 5000
+    return [("app.run()", dev, "development", 5000), ("gunicorn", prod, "production", port)]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("the server on port %d didn't come up" % port)
+
+
+def fetch(connection, path):
+    connection.request("GET", path)
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def client(port, stop, latencies, errors):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    index = 0
+    while not stop.is_set():
+        path = PATHS[index % len(PATHS)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            try:
+                status = fetch(connection, path)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # the server closed the kept-alive connection (a recycled
+                # worker, say); browsers retry on a new one, and so do we
+                connection.close()
+                status = fetch(connection, path)
+        except (OSError, http.client.HTTPException):
+            errors.append(path)
+            connection.close()
+            continue
+        if status >= 400:
+            errors.append(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+    connection.close()
+
+
+def load(port, seconds, concurrency):
+    stop = threading.Event()
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=client, args=(port, stop, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shows", type=int, default=10000)
+    parser.add_argument("--reset", action="store_true", help="allow seeding DATABASE_URL")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--cache", action="store_true", help="keep the page cache on")
+    args = parser.parse_args()
+    if "DATABASE_URL" in os.environ and not args.reset:
+        parser.error("seeding drops the tables of DATABASE_URL, pass --reset to do it")
+    if shutil.which("gunicorn") is None:
+        parser.error("gunicorn isn't installed")
+
+    scratch = tempfile.mkdtemp(prefix="fyyur-serve-")
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(scratch, "fyyur.db"))
+    env.setdefault("LOG_FILE", os.path.join(scratch, "error.log"))
+    env.setdefault("METRICS_DIR", os.path.join(scratch, "metrics"))
+    env.setdefault("SECRET_KEY", "fyyur-serve-benchmark")
+    # production leaves the page cache off unless CACHE_TYPE says otherwise
+    env["CACHE_TYPE"] = env.get("CACHE_TYPE", "memory") if args.cache else "null"
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.seed", "--shows", str(args.shows), "--reset"],
+            cwd=ROOT,
+            env=dict(env, FYYUR_ENV="testing"),
+            check=True,
+        )
+        print(
+            "%-10s %9s %9s %9s %9s %7s"
+            % ("server", "req/s", "p50 ms", "p95 ms", "p99 ms", "errors")
+        )
+        for name, command, profile, port in launchers(args.port):
+            server = subprocess.Popen(
+                command,
+                cwd=ROOT,
+                env=dict(env, FYYUR_ENV=profile),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            try:
+                wait_until_up(port)
+                load(port, 1, args.concurrency)
+                latencies, errors = load(port, args.seconds, args.concurrency)
+            finally:
+                # the debug reloader runs the app in a child process
+                os.killpg(server.pid, signal.SIGTERM)
+                server.wait()
+            print(
+                "%-10s %9.1f %9.2f %9.2f %9.2f %7d"
+                % (
+                    name,
+                    len(latencies) / args.seconds,
+                    percentile(latencies, 0.50),
+                    percentile(latencies, 0.95),
+                    percentile(latencies, 0.99),
+                    len(errors),
+                )
+            )
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compares the streamed listing pages (LISTING_STREAM) with rendering the
+same full listing in one piece, as the catalog grows.
+
+    python -m benchmarks.streaming --sizes 1000,10000,50000
+
+For each --sizes number of shows the database is reseeded with
+benchmarks.seed, and /shows, /artists and /venues are each requested whole:
+once streamed, and once buffered, as a single page of every row. The time to
+the first byte, the time to the last, and the peak memory allocated while
+serving the request (tracemalloc, measured in a separate pass) are printed.
+Streamed, the first two columns stay flat whatever the size.
+
+Without DATABASE_URL this uses an in-memory SQLite database, where yield_per
+fetches in chunks from a client-side cursor; against PostgreSQL it reads from
+a server-side cursor. Seeding DATABASE_URL drops its tables and needs --reset.
+"""
+import os
+
+os.environ.setdefault("FYYUR_ENV", "testing")
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from app import create_app
+from benchmarks import seed
+from cache import NullBackend
+from extensions import db
+
+PATHS = ("/shows", "/artists", "/venues")
+
+
+def fetch(client, path, stream):
+    """(seconds to the first chunk, seconds to the last) of one request"""
+    client.application.config["LISTING_STREAM"] = stream
+    started = time.perf_counter()
+    response = client.get(path if stream else path + "?page_size=1000000000")
+    chunks = iter(response.response)
+    next(chunks, None)
+    first = time.perf_counter() - started
+    for _ in chunks:
+        pass
+    response.close()
+    return first, time.perf_counter() - started
+
+
+def peak_memory(client, path, stream):
+    tracemalloc.start()
+    try:
+        fetch(client, path, stream)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=[1000, 10000, 50000],
+    )
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--reset", action="store_true", help="allow seeding DATABASE_URL"
+    )
+    args = parser.parse_args()
+    if "DATABASE_URL" in os.environ and not args.reset:
+        parser.error("seeding drops the tables of DATABASE_URL, pass --reset to do it")
+
+    app = create_app()
+    app.config["SQL_SLOW_REQUEST_MS"] = None
+    app.config["MAX_PAGE_SIZE"] = 1000000000
+    app.extensions["page_cache"].backend = NullBackend()
+    client = app.test_client()
+
+    print(
+        "%8s %-9s %-9s %10s %10s %10s"
+        % ("shows", "path", "mode", "first ms", "last ms", "peak KiB")
+    )
+    for size in args.sizes:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            seed.seed(size, seed=args.seed)
+        for path in PATHS:
+            for stream in (False, True):
+                fetch(client, path, stream)
+                timings = [fetch(client, path, stream) for _ in range(args.requests)]
+                print(
+                    "%8d %-9s %-9s %10.1f %10.1f %10d"
+                    % (
+                        size,
+                        path,
+                        "streamed" if stream else "buffered",
+                        statistics.median(first for first, last in timings) * 1000,
+                        statistics.median(last for first, last in timings) * 1000,
+                        peak_memory(client, path, stream) // 1024,
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Measures the first requests of a freshly started worker with the template
+bytecode cache empty and filled by ``flask fyyur precompile-templates``.
+
+    python -m benchmarks.template_cache --runs 5
+
+Each run starts a new interpreter against a small seeded SQLite file,
+as a worker does after a deploy, and times the first request of each page
+(whose templates it has not compiled yet). The median per page and in total
+is printed for an empty cache and a filled one.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = [
+    "/",
+    "/venues",
+    "/artists",
+    "/shows",
+    "/venues/1",
+    "/artists/1",
+    "/venues/create",
+    "/artists/create",
+    "/shows/create",
+]
+
+SEED = """
+from app import create_app
+from benchmarks import seed
+from extensions import db
+with create_app().app_context():
+    db.create_all()
+    seed.seed(200)
+"""
+FIRST_REQUESTS = """
+import json, sys, time
+from app import create_app
+client = create_app().test_client()
+timings = {}
+for path in sys.argv[1:]:
+    started = time.perf_counter()
+    response = client.get(path)
+    response.get_data()
+    timings[path] = (time.perf_counter() - started) * 1000
+    assert response.status_code == 200, (path, response.status_code)
+print(json.dumps(timings))
+"""
+
+
+def python(code, env, *args):
+    result = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode:
+        sys.exit(result.stderr)
+    return result.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="fyyur-templates-")
+    cacheDir = os.path.join(scratch, "jinja")
+    env = dict(
+        os.environ,
+        FYYUR_ENV="testing",
+        DATABASE_URL="sqlite:///" + os.path.join(scratch, "fyyur.db"),
+        LOG_FILE=os.path.join(scratch, "error.log"),
+        TEMPLATE_CACHE_DIR=cacheDir,
+    )
+    try:
+        python(SEED, env)
+        results = {}
+        for mode in ("empty", "precompiled"):
+            timings = []
+            for _ in range(args.runs):
+                shutil.rmtree(cacheDir, ignore_errors=True)
+                if mode == "precompiled":
+                    subprocess.run(
+                        ["flask", "--app", "app", "fyyur", "precompile-templates"],
+                        cwd=ROOT,
+                        env=env,
+                        check=True,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                    )
+                timings.append(json.loads(python(FIRST_REQUESTS, env, *PATHS)))
+            results[mode] = {
+                path: statistics.median(timing[path] for timing in timings)
+                for path in PATHS
+            }
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print("%-18s %12s %12s" % ("first request", "empty ms", "compiled ms"))
+    for path in PATHS:
+        print(
+            "%-18s %12.1f %12.1f"
+            % (path, results["empty"][path], results["precompiled"][path])
+        )
+    print(
+        "%-18s %12.1f %12.1f"
+        % (
+            "total",
+            sum(results["empty"].values()),
+            sum(results["precompiled"].values()),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compares the /venues city/state grouping against the original
+implementation.
+
+    python -m benchmarks.venue_grouping --sizes 10000,100000
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from queries import area_order, group_by_area
+
+
+def legacy_group(venues):
+    # the grouping /venues used before: one scan of every venue per area
+    cityState = list(set(venue.city + venue.state for venue in venues))
+    groupedCityState = []
+    for state in cityState:
+        tempGroupedCityState = []
+        for venue in venues:
+            if state == venue.city + venue.state:
+                tempGroupedCityState.append(venue)
+        groupedCityState.append(tempGroupedCityState)
+    return groupedCityState
+
+
+def current_group(venues):
+    # the database does the ORDER BY in production; sort here to be fair
+    return list(group_by_area(sorted(venues, key=area_order)))
+
+
+def make_venues(count, areas, seed):
+    rng = random.Random(seed)
+    places = [("City %d" % i, "S%02d" % (i % 50)) for i in range(areas)]
+    venues = []
+    for id in range(1, count + 1):
+        city, state = rng.choice(places)
+        venues.append(
+            SimpleNamespace(id=id, name="Venue %d" % id, city=city, state=state)
+        )
+    return venues
+
+
+def timed(func, venues):
+    start = time.perf_counter()
+    result = func(venues)
+    return time.perf_counter() - start, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--areas", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("%10s %8s %12s %12s %9s" % ("venues", "areas", "legacy (s)", "current (s)", "speedup"))
+    for size in map(int, args.sizes.split(",")):
+        venues = make_venues(size, args.areas, args.seed)
+        legacy, legacyAreas = timed(legacy_group, venues)
+        current, currentAreas = timed(current_group, venues)
+        assert legacyAreas == currentAreas
+        print(
+            "%10d %8d %12.4f %12.4f %8.1fx"
+            % (size, currentAreas, legacy, current, legacy / current)
+        )
+
+
+if __name__ == "__main__":
+    main()
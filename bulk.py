@@ -0,0 +1,128 @@
+"""Streaming bulk import and export.
+
+Records are read and written one at a time (CSV with a header row, or JSON
+lines) and handled in fixed-size chunks, so memory stays flat however big
+the file is. On PostgreSQL with psycopg2 a chunk is loaded with COPY;
+elsewhere it goes through a single executemany INSERT.
+
+In CSV files lists (genres) are separated by ";", booleans are true/false
+and times are ISO 8601. An empty cell is NULL.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+
+from filters import parse_datetime
+
+FORMATS = ("csv", "jsonl")
+LIST_SEPARATOR = ";"
+
+
+def guess_format(filename):
+    return "jsonl" if filename.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_records(file, format):
+    """Yields each record of file as a dict"""
+    if format == "csv":
+        for row in csv.DictReader(file):
+            yield {key: (value if value != "" else None) for key, value in row.items()}
+    else:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def csv_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return LIST_SEPARATOR.join(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def write_records(file, format, fields, rows):
+    """Writes rows (tuples in fields order) to file, returning the row count"""
+    count = 0
+    if format == "csv":
+        writer = csv.writer(file)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([csv_value(value) for value in row])
+            count += 1
+    else:
+        for row in rows:
+            record = dict(zip(fields, (json_value(value) for value in row)))
+            file.write(json.dumps(record) + "\n")
+            count += 1
+    return count
+
+
+def parse_list(value):
+    if isinstance(value, list):
+        return value
+    return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "t", "yes", "y")
+
+
+def pg_array(values):
+    return "{%s}" % ",".join(
+        '"%s"' % value.replace("\\", "\\\\").replace('"', '\\"') for value in values
+    )
+
+
+def copy_value(value):
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, list):
+        return pg_array(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def copy_supported(connection):
+    dialect = connection.dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+
+def bulk_insert(connection, table, columns, rows):
+    """Inserts rows (tuples in columns order) into table on connection"""
+    if not rows:
+        return
+    if copy_supported(connection):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([copy_value(value) for value in row])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(
+            'COPY "%s" (%s) FROM STDIN WITH (FORMAT csv)'
+            % (table.name, ", ".join('"%s"' % column for column in columns)),
+            buffer,
+        )
+        return
+    connection.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
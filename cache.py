@@ -0,0 +1,218 @@
+"""Page cache for the read-heavy Fyyur pages.
+
+Rendered GET responses are stored per route, entity id and query string. Each
+(route, entity) pair has a generation number that is part of the key, so
+invalidating bumps the generation and every cached variant of that page (all
+pagination cursors, say) becomes unreachable at once; the stale entries then
+age out through LRU eviction or their TTL.
+
+Backends:
+    "memory"  in-process LRU with TTL (default, except in production: each
+              worker would have its own, out of reach of the others' writes)
+    "redis"   shared between workers, needs the ``redis`` package
+    "null"    caching disabled (default in production)
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+
+from flask import Response, make_response, request, session
+
+
+class MemoryBackend:
+    shared = False
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        # generation numbers, evicted like the entries. Numbers are never
+        # reused, so a page whose number was evicted gets a new one and its
+        # old entries stay unreachable
+        self.generations = OrderedDict()
+        self.numbers = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def generation(self, key):
+        with self.lock:
+            if key not in self.generations:
+                self.remember(key)
+            self.generations.move_to_end(key)
+            return self.generations[key]
+
+    def bump(self, key):
+        with self.lock:
+            self.remember(key)
+
+    def remember(self, key):
+        self.generations[key] = next(self.numbers)
+        self.generations.move_to_end(key)
+        while len(self.generations) > self.max_entries:
+            self.generations.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generations.clear()
+
+
+class RedisBackend:
+    shared = True
+
+    def __init__(self, url, prefix="fyyur:page:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('CACHE_TYPE "redis" needs the redis package installed')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def generation(self, key):
+        key = self.prefix + "gen:" + key
+        # generations start from the clock so an evicted counter never
+        # comes back at a number older entries were stored under
+        self.client.set(key, time.time_ns(), nx=True)
+        return int(self.client.get(key))
+
+    def bump(self, key):
+        self.generation(key)
+        self.client.incr(self.prefix + "gen:" + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+class NullBackend:
+    shared = False
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def generation(self, key):
+        return 0
+
+    def bump(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+
+class PageCache:
+    def __init__(self, app=None):
+        self.backend = NullBackend()
+        self.ttl = 60
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        kind = app.config.get("CACHE_TYPE", "memory")
+        self.ttl = app.config.get("CACHE_DEFAULT_TTL", 60)
+        if kind == "memory":
+            self.backend = MemoryBackend(app.config.get("CACHE_MAX_ENTRIES", 1024))
+        elif kind == "redis":
+            self.backend = RedisBackend(app.config["CACHE_REDIS_URL"])
+        elif kind == "null":
+            self.backend = NullBackend()
+        else:
+            raise ValueError("Unknown CACHE_TYPE %r" % kind)
+        app.extensions["page_cache"] = self
+
+    def cached(self, route, entity_arg=None, unless=None):
+        """Caches a GET view's 200 responses under route (and the view
+        argument entity_arg, e.g. "venue_id"); requests for which unless()
+        is true go straight to the view"""
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(**kwargs):
+                # pending flash messages would be rendered into (and hidden
+                # by) the cached copy, so those requests skip the cache
+                if request.method != "GET" or session.get("_flashes"):
+                    return view(**kwargs)
+                if unless is not None and unless():
+                    return view(**kwargs)
+                entity = kwargs.get(entity_arg) if entity_arg else None
+                key = "%s:%s:%d:%s" % (
+                    route,
+                    entity,
+                    self.backend.generation(self.scope(route, entity)),
+                    "&".join("%s=%s" % item for item in sorted(request.args.items())),
+                )
+                cached = self.backend.get(key)
+                if cached is not None:
+                    self.hits[route] += 1
+                    mimetype, _, body = cached.partition(b"\n")
+                    response = Response(body, mimetype=mimetype.decode())
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+                self.misses[route] += 1
+                response = make_response(view(**kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    self.backend.set(
+                        key,
+                        response.mimetype.encode() + b"\n" + response.get_data(),
+                        self.ttl,
+                    )
+                response.headers["X-Cache"] = "MISS"
+                return response
+
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def scope(route, entity=None):
+        return "%s:%s" % (route, entity)
+
+    def invalidate(self, route, *entities):
+        """Drops every cached variant of route, or only of the given entity ids"""
+        for entity in entities or (None,):
+            self.backend.bump(self.scope(route, entity))
+
+    @property
+    def shared(self):
+        """Whether the cache is shared by every process, so that clearing
+        it from one (a CLI command, say) clears it for all"""
+        return self.backend.shared
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return {
+            route: {"hits": self.hits[route], "misses": self.misses[route]}
+            for route in sorted(set(self.hits) | set(self.misses))
+        }
@@ -0,0 +1,271 @@
+"""``flask fyyur`` maintenance commands."""
+import time
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from api import ARTIST_API_FIELDS, VENUE_API_FIELDS
+from assets import build as build_static
+from bulk import (
+    FORMATS,
+    bulk_insert,
+    chunks,
+    guess_format,
+    parse_bool,
+    parse_list,
+    read_records,
+    write_records,
+)
+from extensions import db, page_cache, server_sessions
+from filters import parse_datetime
+from models import Artist, Show, Venue, past_shows_filter, refresh_show_counters
+from templating import precompile
+
+fyyur_cli = AppGroup("fyyur", help="Fyyur maintenance commands.")
+
+
+@fyyur_cli.command("rollover")
+@click.option(
+    "--since",
+    type=int,
+    default=None,
+    help="Only recount venues/artists with shows that started in the last SINCE minutes.",
+)
+def rollover_shows(since):
+    """Moves shows that have started from the upcoming to the past counters.
+    Run it periodically (e.g. from cron) with --since a bit longer than the
+    interval; recounting is idempotent so overlapping runs are harmless."""
+    venueIds = artistIds = None
+    if since is not None:
+        started = Show.query.filter(
+            past_shows_filter(),
+            Show.start_time > datetime.now(timezone.utc) - timedelta(minutes=since),
+        )
+        venueIds = [id for (id,) in started.with_entities(Show.venue_id).distinct()]
+        artistIds = [id for (id,) in started.with_entities(Show.artist_id).distinct()]
+    venues = refresh_show_counters(Venue, Show.venue_id, venueIds)
+    artists = refresh_show_counters(Artist, Show.artist_id, artistIds)
+    db.session.commit()
+    click.echo("Recounted shows for %d venues and %d artists." % (venues, artists))
+
+
+def bulk_fields(fields):
+    """API fields that are stored as given, i.e. without ids and counters"""
+    return {
+        name: column
+        for name, column in fields.items()
+        if name not in ("id", "past_shows_count", "upcoming_shows_count")
+    }
+
+
+# shows name their venue and artist by name, city and state
+SHOW_BULK_FIELDS = {
+    "venue_name": Venue.name,
+    "venue_city": Venue.city,
+    "venue_state": Venue.state,
+    "artist_name": Artist.name,
+    "artist_city": Artist.city,
+    "artist_state": Artist.state,
+    "start_time": Show.start_time,
+}
+
+BULK_KINDS = {
+    "venues": (Venue, bulk_fields(VENUE_API_FIELDS)),
+    "artists": (Artist, bulk_fields(ARTIST_API_FIELDS)),
+    "shows": (Show, SHOW_BULK_FIELDS),
+}
+
+
+def identity(value):
+    return value
+
+
+def import_converter(column):
+    """Function converting values read from a file to the type of column"""
+    columnType = getattr(column.type, "impl", column.type)
+    if isinstance(columnType, db.Boolean):
+        parse = parse_bool
+    elif isinstance(columnType, db.DateTime):
+        parse = parse_datetime
+    elif isinstance(columnType, ARRAY):
+        parse = parse_list
+    else:
+        return identity
+    return lambda value: parse(value) if isinstance(value, str) else value
+
+
+def natural_ids(model, keys):
+    """Maps (name, city, state) keys to the ids of model records; the lowest
+    id wins if several records share a key"""
+    if not keys:
+        return {}
+    rows = (
+        db.session.query(model.name, model.city, model.state, func.min(model.id))
+        .filter(tuple_(model.name, model.city, model.state).in_(keys))
+        .group_by(model.name, model.city, model.state)
+    )
+    return {(name, city, state): id for name, city, state, id in rows}
+
+
+def natural_key(record, prefix):
+    return tuple(record.get(prefix + field) for field in ("_name", "_city", "_state"))
+
+
+def show_rows(records):
+    """Show rows (venue_id, artist_id, start_time) for records, resolving
+    venues and artists by natural key. Returns the rows and the records whose
+    venue or artist doesn't exist."""
+    keys = [(natural_key(r, "venue"), natural_key(r, "artist")) for r in records]
+    venueIds = natural_ids(Venue, {venue for venue, artist in keys})
+    artistIds = natural_ids(Artist, {artist for venue, artist in keys})
+    startTime = import_converter(Show.start_time)
+    rows, missing = [], []
+    for record, (venue, artist) in zip(records, keys):
+        venueId = venueIds.get(venue)
+        artistId = artistIds.get(artist)
+        if venueId is None or artistId is None:
+            missing.append(record)
+            continue
+        rows.append((venueId, artistId, startTime(record.get("start_time"))))
+    return rows, missing
+
+
+@fyyur_cli.command("import")
+@click.argument("kind", type=click.Choice(list(BULK_KINDS)))
+@click.argument("source", type=click.File("r"))
+@click.option(
+    "--format", type=click.Choice(FORMATS), help="Default: from the file name."
+)
+@click.option("--batch-size", type=int, default=5000, show_default=True)
+def import_records(kind, source, format, batch_size):
+    """Bulk loads venues, artists or shows from a CSV or JSON lines file
+    ("-" for stdin). Each batch is inserted (with COPY on PostgreSQL) and
+    committed on its own. Show records name their venue and artist by
+    venue_name/venue_city/venue_state and artist_name/artist_city/artist_state.
+    Pages cached in redis are dropped afterwards; with CACHE_TYPE=memory each
+    worker keeps its copies until they expire (CACHE_DEFAULT_TTL)."""
+    model, fields = BULK_KINDS[kind]
+    if kind == "shows":
+        columns = ["venue_id", "artist_id", "start_time"]
+    else:
+        columns = [column.key for column in fields.values()]
+    converters = [(name, import_converter(column)) for name, column in fields.items()]
+    format = format or guess_format(source.name)
+    started = time.perf_counter()
+    imported = skipped = 0
+    for batch in chunks(read_records(source, format), batch_size):
+        if kind == "shows":
+            rows, missing = show_rows(batch)
+            for record in missing[: max(0, 5 - skipped)]:
+                click.echo("Skipped, unknown venue or artist: %s" % record, err=True)
+            skipped += len(missing)
+        else:
+            rows = [
+                [convert(record.get(name)) for name, convert in converters]
+                for record in batch
+            ]
+        bulk_insert(db.session.connection(), model.__table__, columns, rows)
+        db.session.commit()
+        imported += len(rows)
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed
+        click.echo("%d %s (%.0f rows/s)" % (imported, kind, rate), err=True)
+    if kind == "shows":
+        refresh_show_counters(Venue, Show.venue_id)
+        refresh_show_counters(Artist, Show.artist_id)
+        db.session.commit()
+    # a memory cache belongs to the worker processes, out of this one's reach
+    if page_cache.shared:
+        page_cache.clear()
+    elapsed = time.perf_counter() - started
+    click.echo(
+        "Imported %d %s in %.1fs (%.0f rows/s), skipped %d."
+        % (imported, kind, elapsed, imported / elapsed if elapsed else 0, skipped),
+        err=True,
+    )
+
+
+@fyyur_cli.command("export")
+@click.argument("kind", type=click.Choice(list(BULK_KINDS)))
+@click.option("--output", "-o", type=click.File("w"), default="-", show_default=True)
+@click.option(
+    "--format", type=click.Choice(FORMATS), help="Default: from the file name."
+)
+@click.option("--chunk-size", type=int, default=5000, show_default=True)
+def export_records(kind, output, format, chunk_size):
+    """Writes all venues, artists or shows as CSV or JSON lines, in the
+    format import reads. Rows are streamed from the database in chunks."""
+    model, fields = BULK_KINDS[kind]
+    query = db.session.query(*fields.values())
+    if kind == "shows":
+        query = (
+            query.select_from(Show)
+            .join(Venue, Show.venue_id == Venue.id)
+            .join(Artist, Show.artist_id == Artist.id)
+        )
+    query = query.order_by(model.id)
+    format = format or guess_format(output.name)
+    started = time.perf_counter()
+    count = write_records(output, format, list(fields), query.yield_per(chunk_size))
+    elapsed = time.perf_counter() - started
+    click.echo(
+        "Exported %d %s in %.1fs (%.0f rows/s)."
+        % (count, kind, elapsed, count / elapsed if elapsed else 0),
+        err=True,
+    )
+
+
+@fyyur_cli.command("purge-sessions")
+def purge_sessions():
+    """Deletes expired sessions from the server-side session store. Run it
+    periodically (e.g. daily from cron) when SESSION_TYPE is a store."""
+    purged = server_sessions.purge()
+    if purged is None:
+        click.echo("Sessions are kept in cookies (SESSION_TYPE=cookie), nothing to purge.")
+    else:
+        click.echo("Purged %d expired sessions." % purged)
+
+
+@fyyur_cli.command("build-assets")
+def build_assets():
+    """Copies static/ to ASSETS_DIR with content hashes in the file names and
+    gzip/brotli copies alongside. Run it at deploy time, before the app
+    starts; running workers keep their manifest until restarted."""
+    started = time.perf_counter()
+    manifest = build_static(current_app.static_folder, current_app.config["ASSETS_DIR"])
+    encoded = manifest["encoded"]
+    click.echo(
+        "Built %d assets (%d gzip, %d brotli) in %s in %.1fs."
+        % (
+            len(manifest["assets"]),
+            sum("gzip" in names for names in encoded.values()),
+            sum("br" in names for names in encoded.values()),
+            current_app.config["ASSETS_DIR"],
+            time.perf_counter() - started,
+        )
+    )
+
+
+@fyyur_cli.command("precompile-templates")
+def precompile_templates():
+    """Compiles every template into TEMPLATE_CACHE_DIR, dropping what was
+    there. Run it at deploy time, before the app starts, so new workers load
+    compiled templates instead of compiling them on their first requests."""
+    cache = current_app.jinja_env.bytecode_cache
+    if cache is None:
+        raise click.ClickException("TEMPLATE_CACHE_DIR is not set.")
+    started = time.perf_counter()
+    cache.clear()
+    names = precompile(current_app)
+    click.echo(
+        "Compiled %d templates into %s in %.1fs."
+        % (
+            len(names),
+            current_app.config["TEMPLATE_CACHE_DIR"],
+            time.perf_counter() - started,
+        )
+    )
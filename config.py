@@ -1,13 +1,188 @@
 import os
-SECRET_KEY = os.urandom(32)
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
-# Enable debug mode.
-DEBUG = True
 
-# Connect to the database
+def env_int(name, default):
+    return int(os.environ.get(name, default))
 
 
-# TODO_DONE IMPLEMENT DATABASE URL
-SQLALCHEMY_DATABASE_URI = 'postgresql://postgres:1@localhost:5432/postgres'
+def env_optional_int(name, default):
+    """env_int, except that an empty value or 0 gives None (off)"""
+    return int(os.environ.get(name, default) or 0) or None
+
+
+def env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+class Config:
+    """Settings shared by every profile. The profile is picked with FYYUR_ENV
+    and most values can be overridden by environment variables."""
+
+    # Signs session cookies and CSRF tokens, so every worker and every host
+    # behind the load balancer needs the same one: set SECRET_KEY. Production
+    # refuses to start without it
+    SECRET_KEY = os.environ.get("SECRET_KEY")
+
+    # Enable debug mode.
+    DEBUG = False
+
+    # Connect to the database
+    # TODO_DONE IMPLEMENT DATABASE URL
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        "DATABASE_URL", "postgresql://postgres:1@localhost:5432/postgres"
+    )
+    # Optional read replica; GET requests read from it, everything else uses
+    # the primary
+    SQLALCHEMY_REPLICA_URI = os.environ.get("DATABASE_REPLICA_URL")
+    # After a write, the same client keeps reading from the primary for this
+    # long so it sees its own changes despite replication lag
+    REPLICA_STICKY_SECONDS = env_int("DB_REPLICA_STICKY_SECONDS", 5)
+
+    # Connection pool (ignored for SQLite)
+    DB_POOL_SIZE = env_int("DB_POOL_SIZE", 5)
+    DB_MAX_OVERFLOW = env_int("DB_MAX_OVERFLOW", 10)
+    DB_POOL_PRE_PING = env_bool("DB_POOL_PRE_PING", True)
+    DB_POOL_RECYCLE = env_int("DB_POOL_RECYCLE", 1800)
+    # Per-statement limit in milliseconds, 0 disables it (PostgreSQL only)
+    DB_STATEMENT_TIMEOUT = env_int("DB_STATEMENT_TIMEOUT", 30000)
+
+    # SQL instrumentation: requests spending longer than this in the database
+    # are logged with their slowest statements (set it to 0 or empty to turn
+    # the log off), and SQL_STATS_HEADER adds a Server-Timing header with the
+    # query count and time
+    SQL_SLOW_REQUEST_MS = env_optional_int("SQL_SLOW_REQUEST_MS", 200)
+    SQL_SLOWEST_STATEMENTS = 3
+    SQL_STATS_HEADER = env_bool("SQL_STATS_HEADER", False)
+
+    # /metrics: with several worker processes, each writes its numbers to
+    # METRICS_DIR every METRICS_FLUSH_SECONDS so any worker can report them all
+    METRICS_DIR = os.environ.get("METRICS_DIR")
+    METRICS_FLUSH_SECONDS = 5
+
+    # Log file, written from a background thread when not in debug mode and
+    # shared by the workers; rotate it with logrotate (see logs.py). LOG_JSON
+    # switches to one JSON object per line
+    LOG_FILE = os.environ.get("LOG_FILE", os.path.join(basedir, "error.log"))
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_JSON = env_bool("LOG_JSON", False)
+
+    # Listing pages (keyset pagination)
+    PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+    # List every record on one streamed page instead (see streaming.py):
+    # rows fetched per server-side cursor round trip, characters per write
+    LISTING_STREAM = env_bool("LISTING_STREAM", False)
+    STREAM_CHUNK_ROWS = env_int("STREAM_CHUNK_ROWS", 500)
+    STREAM_BUFFER_SIZE = 16 * 1024
+    # Search results are counted and paged up to this many ("1000+" past it)
+    SEARCH_RESULT_LIMIT = env_int("SEARCH_RESULT_LIMIT", 1000)
+    # Most recent past shows listed on a venue or artist page
+    PAST_SHOWS_LIMIT = 12
+    # Search box suggestions: how many, and how stale a worker's name index
+    # may get before it is reloaded (its own edits apply immediately)
+    TYPEAHEAD_LIMIT = 8
+    TYPEAHEAD_MAX_AGE = env_int("TYPEAHEAD_MAX_AGE", 300)
+    # How long a worker reuses the genre list and per-genre counts
+    GENRE_CACHE_SECONDS = env_int("GENRE_CACHE_SECONDS", 60)
+
+    # Compiled templates shared by the workers, filled by
+    # "flask fyyur precompile-templates" (an empty value turns it off).
+    # Templates are only reread from disk when auto-reload is on, in debug.
+    TEMPLATE_CACHE_DIR = os.environ.get(
+        "TEMPLATE_CACHE_DIR", os.path.join(basedir, "instance", "jinja")
+    )
+    TEMPLATES_AUTO_RELOAD = False
+
+    # Fingerprinted static files, built by "flask fyyur build-assets"
+    ASSETS_DIR = os.environ.get("ASSETS_DIR", os.path.join(basedir, "build", "assets"))
+
+    # Sessions: "cookie" keeps them in the signed cookie; "filesystem" and
+    # "sqlite" keep them server-side, shared by the workers of a host, with
+    # only a session id in the cookie
+    SESSION_TYPE = os.environ.get("SESSION_TYPE", "cookie")
+    SESSION_DIR = os.environ.get(
+        "SESSION_DIR", os.path.join(basedir, "instance", "sessions")
+    )
+    SESSION_SQLITE_PATH = os.environ.get(
+        "SESSION_SQLITE_PATH", os.path.join(basedir, "instance", "sessions.db")
+    )
+
+    # Page cache: "memory" (per process), "redis" (shared, set CACHE_REDIS_URL) or "null"
+    CACHE_TYPE = os.environ.get("CACHE_TYPE", "memory")
+    CACHE_DEFAULT_TTL = 60
+    CACHE_MAX_ENTRIES = 1024
+    CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
+
+    def engine_options(self, uri):
+        if uri.startswith("sqlite"):
+            return {}
+        options = {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+        }
+        if self.DB_STATEMENT_TIMEOUT and uri.startswith("postgresql"):
+            options["connect_args"] = {
+                "options": "-c statement_timeout=%d" % self.DB_STATEMENT_TIMEOUT
+            }
+        return options
+
+    @property
+    def SQLALCHEMY_ENGINE_OPTIONS(self):
+        return self.engine_options(self.SQLALCHEMY_DATABASE_URI)
+
+    @property
+    def SQLALCHEMY_BINDS(self):
+        if not self.SQLALCHEMY_REPLICA_URI:
+            return {}
+        replica = {"url": self.SQLALCHEMY_REPLICA_URI}
+        replica.update(self.engine_options(self.SQLALCHEMY_REPLICA_URI))
+        return {"replica": replica}
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    TEMPLATES_AUTO_RELOAD = True
+    SECRET_KEY = os.environ.get("SECRET_KEY", "fyyur-development-key")
+    SQL_STATS_HEADER = env_bool("SQL_STATS_HEADER", True)
+    DB_POOL_SIZE = env_int("DB_POOL_SIZE", 2)
+
+
+class ProductionConfig(Config):
+    DEBUG = False
+    # each worker would keep a memory cache of its own, which writes handled
+    # by the other workers don't invalidate: only a shared cache is safe here
+    CACHE_TYPE = os.environ.get("CACHE_TYPE", "null")
+    DB_POOL_SIZE = env_int("DB_POOL_SIZE", 10)
+    DB_MAX_OVERFLOW = env_int("DB_MAX_OVERFLOW", 20)
+    DB_STATEMENT_TIMEOUT = env_int("DB_STATEMENT_TIMEOUT", 10000)
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SECRET_KEY = os.environ.get("SECRET_KEY", "fyyur-testing-key")
+    SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite://")
+    SQLALCHEMY_REPLICA_URI = None
+    WTF_CSRF_ENABLED = False
+    CACHE_TYPE = "null"
+
+
+profiles = {
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
+    "testing": TestingConfig,
+}
+
+
+def load(name=None):
+    """Settings object for the named profile, FYYUR_ENV by default"""
+    name = name or os.environ.get("FYYUR_ENV", "development")
+    try:
+        return profiles[name]()
+    except KeyError:
+        raise ValueError(
+            "Unknown FYYUR_ENV %r, expected one of %s" % (name, ", ".join(profiles))
+        )
@@ -0,0 +1,58 @@
+"""Primary/replica routing for db.session.
+
+When SQLALCHEMY_BINDS has a "replica" engine, statements issued while serving
+a GET or HEAD request go to it and everything else (writes, CLI commands,
+flushes) goes to the primary. A client that just wrote something is pinned to
+the primary for REPLICA_STICKY_SECONDS so it reads its own writes.
+
+Processes forked from one that has used the engines (preloaded gunicorn
+workers) start with empty connection pools instead of sharing its sockets.
+"""
+import os
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+
+READ_METHODS = ("GET", "HEAD")
+
+
+def reads_from_replica():
+    if not has_request_context() or request.method not in READ_METHODS:
+        return False
+    if g.get("use_primary"):
+        return False
+    return session.get("_primary_until", 0) < time.time()
+
+
+def pin_to_primary(response):
+    """after_request hook: keeps the client on the primary after a write"""
+    if request.method not in READ_METHODS:
+        seconds = current_app.config.get("REPLICA_STICKY_SECONDS", 0)
+        if seconds:
+            session["_primary_until"] = time.time() + seconds
+    return response
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and "replica" in self._db.engines
+            and reads_from_replica()
+        ):
+            return self._db.engines["replica"]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def dispose_engines_after_fork(app, db):
+    """Drops pooled connections inherited through fork() in the child. The
+    parent keeps using its own; close=False leaves their sockets alone"""
+
+    def dispose():
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+    os.register_at_fork(after_in_child=dispose)
@@ -0,0 +1,35 @@
+"""Flask extensions shared by the blueprints.
+
+They are created unbound here and set up on the app by ``create_app()``, so
+models and views can import them without building an app.
+"""
+from flask_sqlalchemy import SQLAlchemy
+
+from assets import Assets
+from cache import PageCache
+from database import RoutingSession
+from instrumentation import SQLInstrumentation
+from metrics import Metrics
+from sessions import ServerSessions
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+metrics = Metrics()
+page_cache = PageCache()
+static_assets = Assets()
+sql_instrumentation = SQLInstrumentation()
+server_sessions = ServerSessions()
+
+metrics.collect(
+    sql_instrumentation,
+    {
+        "queries": ("fyyur_db_queries_total", "endpoint"),
+        "db_seconds": ("fyyur_db_seconds_total", "endpoint"),
+    },
+)
+metrics.collect(
+    page_cache,
+    {
+        "hits": ("fyyur_page_cache_hits_total", "route"),
+        "misses": ("fyyur_page_cache_misses_total", "route"),
+    },
+)
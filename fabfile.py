@@ -5,9 +5,13 @@ from fabric.contrib.console import confirm
 
 
 def test():
+    # the route benchmark seeds its database, so it gets a throwaway in-memory
+    # one, never the DATABASE_URL of the shell
     with settings(warn_only=True):
         result = local(
-            "python test_tasks.py -v && python test_users.py -v", capture=True
+            "python -m pytest -q && python -m benchmarks.import_time && "
+            "env -u DATABASE_URL FYYUR_ENV=testing python -m benchmarks.routes",
+            capture=True,
         )
     if result.failed and not confirm("Tests failed. Continue?"):
         abort("Aborted at user request.")
@@ -39,9 +43,7 @@ def heroku():
 
 
 def heroku_test():
-    local(
-        "heroku run python test_tasks.py -v && heroku run python test_users.py -v"
-    )
+    local('heroku run "DATABASE_URL=sqlite:// FYYUR_ENV=testing python -m benchmarks.routes"')
 
 
 def deploy():
@@ -0,0 +1,63 @@
+"""Jinja filters.
+
+``datetime`` formats show times on every show tile, so it avoids the generic
+paths: ISO 8601 strings are parsed with ``datetime.fromisoformat`` (dateutil
+is only the fallback), babel patterns are compiled once per format and
+locales parsed once per name, and recent results are memoized. babel itself
+is imported on the first call, not when the app starts.
+"""
+from datetime import datetime, timezone
+from functools import lru_cache
+
+PATTERNS = {
+    "full": "EEEE MMMM, d, y 'at' h:mma",
+    "medium": "EE MM, dd, y h:mma",
+}
+# babel's own named formats, which aren't patterns
+NAMED_FORMATS = ("short", "long")
+
+
+@lru_cache(maxsize=None)
+def compiled_pattern(format):
+    from babel.dates import parse_pattern
+
+    return parse_pattern(PATTERNS.get(format, format))
+
+
+@lru_cache(maxsize=None)
+def parsed_locale(name):
+    from babel import Locale
+
+    return Locale.parse(name)
+
+
+def parse_datetime(value):
+    """ISO 8601 strings take the fast path, anything else goes to dateutil"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        import dateutil.parser
+
+        return dateutil.parser.parse(value)
+
+
+@lru_cache(maxsize=4096)
+def cached_format(value, tzinfo, format, locale):
+    # tzinfo is part of the key because aware datetimes at the same instant
+    # compare equal whatever their zone
+    date = parse_datetime(value) if isinstance(value, str) else value
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    if format in NAMED_FORMATS:
+        from babel.dates import format_datetime as babel_format_datetime
+
+        return babel_format_datetime(date, format, locale=locale)
+    return compiled_pattern(format).apply(date, parsed_locale(locale))
+
+
+def format_datetime(value, format="medium", locale="en"):
+    """Formats a datetime or date string with a babel pattern, or "full" /
+    "medium" for the site's own"""
+    if value is None:
+        return ""
+    return cached_format(value, getattr(value, "tzinfo", None), format, locale)
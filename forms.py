@@ -2,6 +2,7 @@ from datetime import datetime
 from flask_wtf import Form
 from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField
 from wtforms.validators import DataRequired, AnyOf, URL
+from genres import catalog
 
 class ShowForm(Form):
     artist_id = StringField(
@@ -17,27 +18,6 @@ class ShowForm(Form):
     )
 
 class VenueForm(Form):
-    genreChoices = [
-            ('Alternative', 'Alternative'),
-            ('Blues', 'Blues'),
-            ('Classical', 'Classical'),
-            ('Country', 'Country'),
-            ('Electronic', 'Electronic'),
-            ('Folk', 'Folk'),
-            ('Funk', 'Funk'),
-            ('Hip-Hop', 'Hip-Hop'),
-            ('Heavy Metal', 'Heavy Metal'),
-            ('Instrumental', 'Instrumental'),
-            ('Jazz', 'Jazz'),
-            ('Musical Theatre', 'Musical Theatre'),
-            ('Pop', 'Pop'),
-            ('Punk', 'Punk'),
-            ('R&B', 'R&B'),
-            ('Reggae', 'Reggae'),
-            ('Rock n Roll', 'Rock n Roll'),
-            ('Soul', 'Soul'),
-            ('Other', 'Other'),
-    ]
     name = StringField(
         'name', validators=[DataRequired()]
     )
@@ -111,8 +91,9 @@ class VenueForm(Form):
     )
     genres = SelectMultipleField(
         # TODO_DONE implement enum restriction
-        'genres', validators=[DataRequired(), AnyOf(genreChoices)],
-        choices = genreChoices
+        # choices (and so the allowed values) come from the Genre table
+        'genres', validators=[DataRequired()],
+        choices = catalog.choices
     )
     facebook_link = StringField(
         'facebook_link', validators=[URL()]
@@ -212,27 +193,7 @@ class ArtistForm(Form):
     )
     musicGenres = SelectMultipleField(
         'musicGenres', validators=[DataRequired()],
-        choices=[
-            ('Alternative', 'Alternative'),
-            ('Blues', 'Blues'),
-            ('Classical', 'Classical'),
-            ('Country', 'Country'),
-            ('Electronic', 'Electronic'),
-            ('Folk', 'Folk'),
-            ('Funk', 'Funk'),
-            ('Hip-Hop', 'Hip-Hop'),
-            ('Heavy Metal', 'Heavy Metal'),
-            ('Instrumental', 'Instrumental'),
-            ('Jazz', 'Jazz'),
-            ('Musical Theatre', 'Musical Theatre'),
-            ('Pop', 'Pop'),
-            ('Punk', 'Punk'),
-            ('R&B', 'R&B'),
-            ('Reggae', 'Reggae'),
-            ('Rock n Roll', 'Rock n Roll'),
-            ('Soul', 'Soul'),
-            ('Other', 'Other'),
-        ]
+        choices=catalog.choices
      )
     facebook_link = StringField(
         # TODO_DONE implement enum restriction
@@ -0,0 +1,87 @@
+"""Music genres.
+
+The Genre table is the one list of genres: the venue and artist forms offer
+it, search recognises its names and the listing pages filter on it. DEFAULTS
+seeds the table. The names, and how many venues and artists have each genre,
+are cached per process for GENRE_CACHE_SECONDS; the routes that change venues
+or artists drop their counts right away.
+"""
+import threading
+import time
+
+DEFAULTS = (
+    "Alternative",
+    "Blues",
+    "Classical",
+    "Country",
+    "Electronic",
+    "Folk",
+    "Funk",
+    "Hip-Hop",
+    "Heavy Metal",
+    "Instrumental",
+    "Jazz",
+    "Musical Theatre",
+    "Pop",
+    "Punk",
+    "R&B",
+    "Reggae",
+    "Rock n Roll",
+    "Soul",
+    "Other",
+)
+
+
+class Genres:
+    def __init__(self):
+        # until init_app, e.g. in scripts that don't load the app, the
+        # defaults stand in for the table
+        self.loader = None
+        self.counters = {}
+        self.max_age = 60
+        self.cached = {}
+        self.lock = threading.Lock()
+
+    def init_app(self, app, loader, counters):
+        """loader returns the genre names; counters maps a kind ("venues")
+        to a function returning {genre: count}"""
+        self.loader = loader
+        self.counters = counters
+        self.max_age = app.config.get("GENRE_CACHE_SECONDS", 60)
+        app.extensions["genres"] = self
+
+    def memoized(self, key, compute):
+        with self.lock:
+            entry = self.cached.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.max_age:
+            return entry[1]
+        value = compute()
+        with self.lock:
+            self.cached[key] = (time.monotonic(), value)
+        return value
+
+    def names(self):
+        if self.loader is None:
+            return list(DEFAULTS)
+        return self.memoized("names", self.loader)
+
+    def choices(self):
+        """(value, label) pairs for a form field"""
+        return [(name, name) for name in self.names()]
+
+    def canonical(self, term):
+        """The genre named term, whatever its case, or None"""
+        term = term.strip().lower()
+        return next((name for name in self.names() if name.lower() == term), None)
+
+    def counts(self, kind):
+        """{genre: number of records of kind with it}"""
+        return self.memoized(kind, self.counters[kind])
+
+    def invalidate(self, *kinds):
+        with self.lock:
+            for kind in kinds:
+                self.cached.pop(kind, None)
+
+
+catalog = Genres()
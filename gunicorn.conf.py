@@ -0,0 +1,37 @@
+"""Gunicorn settings for serving Fyyur.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+There are 2 x CPUs + 1 worker processes (WEB_CONCURRENCY overrides), each
+running GUNICORN_THREADS request threads (4 by default, well within the
+worker's DB_POOL_SIZE) so one worker keeps serving while others wait on the
+database. Workers are recycled after about MAX_REQUESTS requests.
+
+With GUNICORN_PRELOAD (on by default) the app is imported once in the master
+and the workers are forked from it. That's faster to start and shares memory,
+and each worker drops the inherited database connections (see database.py).
+
+Reloading: ``kill -HUP <master pid>`` starts fresh workers with the current
+settings and retires the old ones after their in-flight requests. Preloaded
+code only changes with a new master: send USR2 to start one next to the old,
+then QUIT the old master once the new workers are up.
+"""
+import multiprocessing
+import os
+
+from config import env_bool, env_int
+
+bind = "0.0.0.0:%s" % os.environ.get("PORT", "5000")
+workers = env_int("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+threads = env_int("GUNICORN_THREADS", 4)
+worker_class = "gthread" if threads > 1 else "sync"
+preload_app = env_bool("GUNICORN_PRELOAD", True)
+
+max_requests = env_int("MAX_REQUESTS", 2000)
+max_requests_jitter = max_requests // 10
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
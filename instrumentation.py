@@ -0,0 +1,123 @@
+"""Per-request SQL instrumentation.
+
+Cursor execute hooks on every engine time each statement. While a request is
+being served the timings are collected on ``g``: the number of statements,
+total time spent in the database and the slowest few statements. Requests
+whose database time passes SQL_SLOW_REQUEST_MS are written to the app log
+with those statements, SQL_STATS_HEADER adds the numbers to the response as
+a Server-Timing header (shown in the browser dev tools), and per-endpoint
+totals are kept for the metrics endpoint.
+"""
+import heapq
+import itertools
+import re
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestQueries:
+    def __init__(self, keep=3):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+        self.order = itertools.count()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        # a bounded min-heap, so the cheapest of the kept statements is the
+        # one pushed out
+        entry = (duration, next(self.order), statement)
+        if len(self.slowest) < self.keep:
+            heapq.heappush(self.slowest, entry)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def top(self):
+        return [
+            (duration, statement)
+            for duration, _, statement in sorted(self.slowest, reverse=True)
+        ]
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        queries = g.get("sql_queries")
+        if queries is not None:
+            queries.record(statement, time.perf_counter() - conn.info["query_start"])
+
+
+def one_line(statement, limit=500):
+    statement = re.sub(r"\s+", " ", statement).strip()
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+class SQLInstrumentation:
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        # endpoint -> [requests, statements, seconds in the database]
+        self.totals = defaultdict(lambda: [0, 0, 0.0])
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not event.contains(Engine, "before_cursor_execute", before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+        app.before_request(self.start)
+        app.after_request(self.finish)
+        app.extensions["sql_instrumentation"] = self
+
+    def start(self):
+        keep = current_app.config.get("SQL_SLOWEST_STATEMENTS", 3)
+        g.sql_queries = RequestQueries(keep)
+
+    def finish(self, response):
+        queries = g.pop("sql_queries", None)
+        if queries is None:
+            return response
+        endpoint = request.endpoint or "unmatched"
+        with self.lock:
+            totals = self.totals[endpoint]
+            totals[0] += 1
+            totals[1] += queries.count
+            totals[2] += queries.duration
+
+        milliseconds = queries.duration * 1000
+        threshold = current_app.config.get("SQL_SLOW_REQUEST_MS")
+        if threshold is not None and milliseconds >= threshold:
+            current_app.logger.warning(
+                "Slow request %s %s (%s): %d queries, %.1f ms in the database\n%s",
+                request.method,
+                request.full_path.rstrip("?"),
+                endpoint,
+                queries.count,
+                milliseconds,
+                "\n".join(
+                    "  %.1f ms  %s" % (duration * 1000, one_line(statement))
+                    for duration, statement in queries.top()
+                ),
+            )
+        if current_app.config.get("SQL_STATS_HEADER"):
+            response.headers.add(
+                "Server-Timing",
+                'db;dur=%.1f;desc="%d queries"' % (milliseconds, queries.count),
+            )
+        return response
+
+    def stats(self):
+        with self.lock:
+            return {
+                endpoint: {"requests": requests, "queries": count, "db_seconds": seconds}
+                for endpoint, (requests, count, seconds) in sorted(self.totals.items())
+            }
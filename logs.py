@@ -0,0 +1,113 @@
+"""Queued application logging.
+
+Request threads only put records on an in-memory queue; a QueueListener
+thread formats them and writes the log file, so slow disks don't add to
+request latency. LOG_JSON writes one JSON object per line instead of text.
+
+Every gunicorn worker appends to the same LOG_FILE, so none of them may
+rotate it: one renaming the file would leave the others writing to the old
+one. Rotation is left to logrotate (or similar), without copytruncate; each
+worker notices the file was moved and reopens LOG_FILE. For example:
+
+    /srv/fyyur/error.log {
+        daily
+        maxsize 10M
+        rotate 7
+        compress
+        delaycompress
+        missingok
+    }
+
+Every request gets a correlation id, taken from a well-formed X-Request-ID
+header or generated, which is added to its log records and echoed in the
+response.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import uuid
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+from flask import g, has_request_context, request
+
+REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+TEXT_FORMAT = (
+    "%(asctime)s %(levelname)s [%(request_id)s]: %(message)s "
+    "[in %(pathname)s:%(lineno)d]"
+)
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = g.get("request_id", "-") if has_request_context() else "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+            "location": "%s:%d" % (record.pathname, record.lineno),
+        }
+        return json.dumps(entry)
+
+
+def assign_request_id():
+    supplied = request.headers.get("X-Request-ID", "")
+    g.request_id = supplied if REQUEST_ID.match(supplied) else uuid.uuid4().hex
+
+
+def echo_request_id(response):
+    if "request_id" in g:
+        response.headers["X-Request-ID"] = g.request_id
+    return response
+
+
+def file_handler(config):
+    # appends, and reopens the file when logrotate has moved it
+    handler = WatchedFileHandler(config["LOG_FILE"], delay=True)
+    if config["LOG_JSON"]:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def init_logging(app, to_file=True):
+    """Adds request ids to app.logger records and, with to_file, sends the
+    records through the queue to the log file"""
+    app.before_request(assign_request_id)
+    app.after_request(echo_request_id)
+    if not to_file:
+        return None
+
+    records = queue.SimpleQueue()
+    queue_handler = QueueHandler(records)
+    # filtered in the thread that logs, where the request is still known
+    queue_handler.addFilter(RequestIdFilter())
+    listener = QueueListener(
+        records, file_handler(app.config), respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    def restart_in_child():
+        # a forked worker doesn't inherit the listener thread, so it starts
+        # its own, on a new queue: the inherited one can be left locked by
+        # the parent's listener and would never hand over a record
+        queue_handler.queue = listener.queue = queue.SimpleQueue()
+        listener.start()
+
+    os.register_at_fork(after_in_child=restart_in_child)
+
+    app.logger.setLevel(app.config["LOG_LEVEL"])
+    app.logger.addHandler(queue_handler)
+    return listener
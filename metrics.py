@@ -0,0 +1,309 @@
+"""Prometheus metrics.
+
+Every thread records into its own shard of plain dicts, so the request path
+takes no locks. A worker merges its shards when it is scraped, and with
+METRICS_DIR set it also writes the merged numbers to ``<METRICS_DIR>/<pid>.json``
+every METRICS_FLUSH_SECONDS (and on exit) by an atomic rename. /metrics on
+any gunicorn worker then adds up the files of all workers, so the result
+doesn't depend on which worker answers the scrape. Gauges only count
+workers that are still running. Empty the directory when the server starts.
+
+Collected:
+    fyyur_request_duration_seconds      histogram per endpoint and method
+    fyyur_requests_in_flight            gauge
+    fyyur_template_render_seconds       histogram per template (needs blinker)
+    fyyur_db_pool_checkout_wait_seconds histogram of waits for a pooled connection
+    fyyur_db_queries_total, fyyur_db_seconds_total           from SQLInstrumentation
+    fyyur_page_cache_hits_total, fyyur_page_cache_misses_total and
+    fyyur_page_cache_hit_ratio                               from PageCache
+"""
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+from flask import g, request
+from flask.signals import before_render_template, signals_available, template_rendered
+from sqlalchemy.pool import QueuePool
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    "fyyur_request_duration_seconds": ("histogram", "Request latency by endpoint"),
+    "fyyur_requests_in_flight": ("gauge", "Requests being served"),
+    "fyyur_template_render_seconds": ("histogram", "Template render time"),
+    "fyyur_db_pool_checkout_wait_seconds": (
+        "histogram",
+        "Time spent waiting for a pooled database connection",
+    ),
+    "fyyur_db_queries_total": ("counter", "SQL statements executed by endpoint"),
+    "fyyur_db_seconds_total": ("counter", "Time spent in SQL statements by endpoint"),
+    "fyyur_page_cache_hits_total": ("counter", "Page cache hits by route"),
+    "fyyur_page_cache_misses_total": ("counter", "Page cache misses by route"),
+    "fyyur_page_cache_hit_ratio": ("gauge", "Page cache hits over lookups by route"),
+}
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(**values):
+    """Renders label values the way they appear between the braces"""
+    return ",".join(
+        '%s="%s"' % (name, escape(value)) for name, value in sorted(values.items())
+    )
+
+
+class Shard:
+    def __init__(self):
+        # (metric, labels) -> value, or [bucket counts..., +Inf count, sum]
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+
+class Registry:
+    def __init__(self):
+        self.local = threading.local()
+        self.shards = []
+        # callables returning [(metric, labels, value)] for counters kept elsewhere
+        self.collectors = []
+
+    def shard(self):
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            shard = self.local.shard = Shard()
+            self.shards.append(shard)
+        return shard
+
+    def inc(self, metric, label="", value=1):
+        counters = self.shard().counters
+        key = (metric, label)
+        counters[key] = counters.get(key, 0) + value
+
+    def add(self, metric, label="", value=1):
+        gauges = self.shard().gauges
+        key = (metric, label)
+        gauges[key] = gauges.get(key, 0) + value
+
+    def observe(self, metric, label, value):
+        histograms = self.shard().histograms
+        key = (metric, label)
+        counts = histograms.get(key)
+        if counts is None:
+            counts = histograms[key] = [0] * (len(BUCKETS) + 2)
+        counts[bisect.bisect_left(BUCKETS, value)] += 1
+        counts[-1] += value
+
+    def snapshot(self):
+        """Merged numbers of this process as {"counters": {metric: {labels:
+        value}}, "gauges": ..., "histograms": ...}"""
+        merged = {"counters": {}, "gauges": {}, "histograms": {}}
+        for shard in list(self.shards):
+            for kind in ("counters", "gauges"):
+                for (metric, label), value in dict(getattr(shard, kind)).items():
+                    series = merged[kind].setdefault(metric, {})
+                    series[label] = series.get(label, 0) + value
+            for (metric, label), counts in dict(shard.histograms).items():
+                series = merged["histograms"].setdefault(metric, {})
+                add_counts(series, label, list(counts))
+        for collect in self.collectors:
+            for metric, label, value in collect():
+                series = merged["counters"].setdefault(metric, {})
+                series[label] = series.get(label, 0) + value
+        return merged
+
+
+def add_counts(series, label, counts):
+    total = series.get(label)
+    if total is None:
+        series[label] = counts
+    else:
+        series[label] = [a + b for a, b in zip(total, counts)]
+
+
+def merge(snapshots):
+    merged = {"counters": {}, "gauges": {}, "histograms": {}}
+    for snapshot, alive in snapshots:
+        for kind in ("counters", "gauges"):
+            if kind == "gauges" and not alive:
+                continue
+            for metric, series in snapshot[kind].items():
+                target = merged[kind].setdefault(metric, {})
+                for label, value in series.items():
+                    target[label] = target.get(label, 0) + value
+        for metric, series in snapshot["histograms"].items():
+            target = merged["histograms"].setdefault(metric, {})
+            for label, counts in series.items():
+                add_counts(target, label, counts)
+    return merged
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+registry = Registry()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            registry.observe(
+                "fyyur_db_pool_checkout_wait_seconds", "", time.perf_counter() - started
+            )
+
+
+def timed_pool(options):
+    """Engine options with TimedQueuePool, for engines that use a queue pool"""
+    if "pool_size" in options and "poolclass" not in options:
+        options = dict(options, poolclass=TimedQueuePool)
+    return options
+
+
+class Metrics:
+    def __init__(self, app=None):
+        self.registry = registry
+        self.directory = None
+        self.flush_seconds = 5
+        self.flushed = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Call before SQLAlchemy(app) so the engines get the timed pool"""
+        self.directory = app.config.get("METRICS_DIR")
+        self.flush_seconds = app.config.get("METRICS_FLUSH_SECONDS", 5)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            atexit.register(self.flush)
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = timed_pool(
+            app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+        )
+        app.config["SQLALCHEMY_BINDS"] = {
+            key: timed_pool(bind) if isinstance(bind, dict) else bind
+            for key, bind in app.config.get("SQLALCHEMY_BINDS", {}).items()
+        }
+        app.before_request(self.start_request)
+        app.teardown_request(self.end_request)
+        if signals_available:
+            before_render_template.connect(self.start_render, app)
+            template_rendered.connect(self.end_render, app)
+        app.extensions["metrics"] = self
+
+    def collect(self, source, fields):
+        """Exports the per-key counters of source.stats() as metrics, e.g.
+        collect(page_cache, {"hits": ("fyyur_page_cache_hits_total", "route")})"""
+
+        def collector():
+            for key, values in source.stats().items():
+                for field, (metric, label) in fields.items():
+                    yield metric, labels(**{label: key}), values[field]
+
+        self.registry.collectors.append(collector)
+
+    def start_request(self):
+        g.metrics_started = time.perf_counter()
+        self.registry.add("fyyur_requests_in_flight")
+
+    def end_request(self, exc=None):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return
+        self.registry.add("fyyur_requests_in_flight", value=-1)
+        self.registry.observe(
+            "fyyur_request_duration_seconds",
+            labels(endpoint=request.endpoint or "unmatched", method=request.method),
+            time.perf_counter() - started,
+        )
+        if self.directory and time.monotonic() - self.flushed >= self.flush_seconds:
+            self.flush()
+
+    def start_render(self, sender, template, context, **extra):
+        g.setdefault("metrics_renders", []).append(time.perf_counter())
+
+    def end_render(self, sender, template, context, **extra):
+        renders = g.get("metrics_renders")
+        if renders:
+            self.registry.observe(
+                "fyyur_template_render_seconds",
+                labels(template=template.name),
+                time.perf_counter() - renders.pop(),
+            )
+
+    def path(self, pid):
+        return os.path.join(self.directory, "%d.json" % pid)
+
+    def flush(self):
+        self.flushed = time.monotonic()
+        path = self.path(os.getpid())
+        temporary = "%s.%d.tmp" % (path, threading.get_ident())
+        with open(temporary, "w") as file:
+            json.dump(self.registry.snapshot(), file)
+        os.replace(temporary, path)
+
+    def gather(self):
+        pid = os.getpid()
+        snapshots = [(self.registry.snapshot(), True)]
+        if self.directory:
+            for path in glob.glob(os.path.join(self.directory, "*.json")):
+                other = int(os.path.basename(path).split(".")[0])
+                if other == pid:
+                    continue
+                try:
+                    with open(path) as file:
+                        snapshots.append((json.load(file), pid_alive(other)))
+                except (OSError, ValueError):
+                    continue
+        return merge(snapshots)
+
+    def render(self):
+        """All workers' metrics in the Prometheus text format"""
+        merged = self.gather()
+        hits = merged["counters"].get("fyyur_page_cache_hits_total", {})
+        misses = merged["counters"].get("fyyur_page_cache_misses_total", {})
+        merged["gauges"]["fyyur_page_cache_hit_ratio"] = {
+            label: hits.get(label, 0) / float(hits.get(label, 0) + misses.get(label, 0))
+            for label in set(hits) | set(misses)
+            if hits.get(label, 0) + misses.get(label, 0)
+        }
+        lines = []
+        for metric, (kind, help) in METRICS.items():
+            series = merged[kind + "s"].get(metric)
+            if not series:
+                continue
+            lines.append("# HELP %s %s" % (metric, help))
+            lines.append("# TYPE %s %s" % (metric, kind))
+            for label, value in sorted(series.items()):
+                if kind != "histogram":
+                    lines.append(sample(metric, label, value))
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), value[:-1]):
+                    cumulative += count
+                    bucket = (label + "," if label else "") + 'le="%s"' % bound
+                    lines.append(sample(metric + "_bucket", bucket, cumulative))
+                lines.append(sample(metric + "_sum", label, value[-1]))
+                lines.append(sample(metric + "_count", label, cumulative))
+        return "\n".join(lines) + "\n"
+
+
+def sample(metric, label, value):
+    if label:
+        metric = "%s{%s}" % (metric, label)
+    return "%s %s" % (metric, repr(float(value)))
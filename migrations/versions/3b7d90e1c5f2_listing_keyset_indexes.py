@@ -0,0 +1,33 @@
+"""Listing keyset indexes
+
+Revision ID: 3b7d90e1c5f2
+Revises: e4b29d51f6a8
+Create Date: 2026-10-18 12:31:54.207716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7d90e1c5f2'
+down_revision = 'e4b29d51f6a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # one index per listing sort order so every page is a range scan
+    with op.batch_alter_table('Show', schema=None) as batch_op:
+        batch_op.create_index('ix_Show_start_time_id', ['start_time', 'id'], unique=False)
+
+    with op.batch_alter_table('Venue', schema=None) as batch_op:
+        batch_op.create_index('ix_Venue_state_city_name_id', ['state', 'city', 'name', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('Venue', schema=None) as batch_op:
+        batch_op.drop_index('ix_Venue_state_city_name_id')
+
+    with op.batch_alter_table('Show', schema=None) as batch_op:
+        batch_op.drop_index('ix_Show_start_time_id')
@@ -0,0 +1,40 @@
+"""Typed show start_time
+
+Revision ID: 5c1e7a9d2b40
+Revises: db5cb1646db9
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e7a9d2b40'
+down_revision = 'db5cb1646db9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # existing rows hold ISO strings written by the show form, so they cast
+    # straight to timestamptz; blank strings become NULL
+    with op.batch_alter_table('Show', schema=None) as batch_op:
+        batch_op.alter_column('start_time',
+               existing_type=sa.String(length=100),
+               type_=sa.DateTime(timezone=True),
+               existing_nullable=True,
+               postgresql_using="NULLIF(start_time, '')::timestamp with time zone")
+        batch_op.create_index('ix_Show_venue_id_start_time', ['venue_id', 'start_time'], unique=False)
+        batch_op.create_index('ix_Show_artist_id_start_time', ['artist_id', 'start_time'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('Show', schema=None) as batch_op:
+        batch_op.drop_index('ix_Show_artist_id_start_time')
+        batch_op.drop_index('ix_Show_venue_id_start_time')
+        batch_op.alter_column('start_time',
+               existing_type=sa.DateTime(timezone=True),
+               type_=sa.String(length=100),
+               existing_nullable=True,
+               postgresql_using="to_char(start_time, 'YYYY-MM-DD\"T\"HH24:MI:SS')")
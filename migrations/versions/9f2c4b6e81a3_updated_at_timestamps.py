@@ -0,0 +1,30 @@
+"""updated_at timestamps
+
+Revision ID: 9f2c4b6e81a3
+Revises: 3b7d90e1c5f2
+Create Date: 2026-10-18 14:06:12.554310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f2c4b6e81a3'
+down_revision = '3b7d90e1c5f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # existing rows start out modified "now"; the API's Last-Modified
+    # headers are accurate from the next write on
+    for table in ('Venue', 'Artist', 'Show'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade():
+    for table in ('Show', 'Artist', 'Venue'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,51 @@
+"""Maintained show counters
+
+Revision ID: a83f0c2e6d17
+Revises: 5c1e7a9d2b40
+Create Date: 2026-10-18 11:02:47.118530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a83f0c2e6d17'
+down_revision = '5c1e7a9d2b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # backfill from the Show table before the counters become NOT NULL;
+    # `flask fyyur rollover` keeps them current from here on
+    for table, key in (('Venue', 'venue_id'), ('Artist', 'artist_id')):
+        op.execute(
+            'UPDATE "{0}" SET '
+            'upcoming_shows_count = (SELECT count(*) FROM "Show" '
+            'WHERE "Show".{1} = "{0}".id AND "Show".start_time > now()), '
+            'past_shows_count = (SELECT count(*) FROM "Show" '
+            'WHERE "Show".{1} = "{0}".id AND "Show".start_time <= now())'.format(table, key)
+        )
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('past_shows_count',
+                   existing_type=sa.Integer(),
+                   nullable=False,
+                   server_default='0')
+            batch_op.alter_column('upcoming_shows_count',
+                   existing_type=sa.Integer(),
+                   nullable=False,
+                   server_default='0')
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('upcoming_shows_count',
+                   existing_type=sa.Integer(),
+                   nullable=True,
+                   server_default=None)
+            batch_op.alter_column('past_shows_count',
+                   existing_type=sa.Integer(),
+                   nullable=True,
+                   server_default=None)
@@ -0,0 +1,57 @@
+"""Genre table and GIN indexes on the genre arrays
+
+Revision ID: c3a8e51f0d92
+Revises: 9f2c4b6e81a3
+Create Date: 2026-10-18 16:21:37.208415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a8e51f0d92'
+down_revision = '9f2c4b6e81a3'
+branch_labels = None
+depends_on = None
+
+# the form choices this table replaces
+GENRES = (
+    'Alternative', 'Blues', 'Classical', 'Country', 'Electronic', 'Folk',
+    'Funk', 'Hip-Hop', 'Heavy Metal', 'Instrumental', 'Jazz', 'Musical Theatre',
+    'Pop', 'Punk', 'R&B', 'Reggae', 'Rock n Roll', 'Soul', 'Other',
+)
+
+
+def upgrade():
+    genre = op.create_table('Genre',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.bulk_insert(genre, [{'name': name} for name in GENRES])
+    # keep genres already stored on venues and artists selectable
+    op.execute(
+        'INSERT INTO "Genre" (name) '
+        'SELECT DISTINCT used.name FROM ('
+        'SELECT unnest(genres) FROM "Venue" '
+        'UNION SELECT unnest("musicGenres") FROM "Artist"'
+        ') AS used(name) WHERE used.name IS NOT NULL '
+        'ON CONFLICT (name) DO NOTHING'
+    )
+    with op.batch_alter_table('Venue', schema=None) as batch_op:
+        batch_op.create_index('ix_Venue_genres', ['genres'], unique=False, postgresql_using='gin')
+
+    with op.batch_alter_table('Artist', schema=None) as batch_op:
+        batch_op.create_index('ix_Artist_musicGenres', ['musicGenres'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    with op.batch_alter_table('Artist', schema=None) as batch_op:
+        batch_op.drop_index('ix_Artist_musicGenres')
+
+    with op.batch_alter_table('Venue', schema=None) as batch_op:
+        batch_op.drop_index('ix_Venue_genres')
+
+    op.drop_table('Genre')
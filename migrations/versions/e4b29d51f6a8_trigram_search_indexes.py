@@ -0,0 +1,35 @@
+"""Trigram search indexes
+
+Revision ID: e4b29d51f6a8
+Revises: a83f0c2e6d17
+Create Date: 2026-10-18 11:48:05.630981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b29d51f6a8'
+down_revision = 'a83f0c2e6d17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in ('Venue', 'Artist'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in ('name', 'city'):
+                batch_op.create_index('ix_{}_{}_trgm'.format(table, column), [column],
+                       unique=False,
+                       postgresql_using='gin',
+                       postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    # pg_trgm is left installed; other database objects may depend on it
+    for table in ('Artist', 'Venue'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index('ix_{}_city_trgm'.format(table))
+            batch_op.drop_index('ix_{}_name_trgm'.format(table))
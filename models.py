@@ -0,0 +1,196 @@
+"""Venue, Artist, Show and Genre models, with the show predicates and the
+past/upcoming show counters kept on venues and artists."""
+from sqlalchemy import DDL, case, event, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from extensions import db
+from genres import DEFAULTS
+
+# ----------------------------------------------------------------------------#
+# Models.
+# ----------------------------------------------------------------------------#
+
+
+def trigram_index(table, column):
+    """GIN trigram index backing ILIKE search on Postgres"""
+    return db.Index(
+        "ix_%s_%s_trgm" % (table, column),
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    )
+
+
+# the trigram indexes need pg_trgm; migrations create it, this covers create_all
+event.listen(
+    db.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class Venue(db.Model):
+    __tablename__ = "Venue"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200))
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    address = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    genres = db.Column(ARRAY(db.String).with_variant(db.JSON, "sqlite"))
+    image_link = db.Column(db.String(500))
+    website = db.Column(db.String(500))
+    facebook_link = db.Column(db.String(120))
+    seeking_talent = db.Column(db.Boolean, unique=False, default=False)
+    seeking_description = db.Column(db.Text)
+    shows = db.relationship("Show", backref="Venue")
+    past_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        trigram_index("Venue", "name"),
+        trigram_index("Venue", "city"),
+        db.Index("ix_Venue_state_city_name_id", "state", "city", "name", "id"),
+        db.Index("ix_Venue_genres", "genres", postgresql_using="gin"),
+    )
+
+    # TODO_DONE: implement any missing fields, as a database migration using Flask-Migrate
+
+
+class Artist(db.Model):
+    __tablename__ = "Artist"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200))
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    musicGenres = db.Column(ARRAY(db.String(100)).with_variant(db.JSON, "sqlite"))
+    image_link = db.Column(db.String(500))
+    website = db.Column(db.String(500))
+    facebook_link = db.Column(db.String(500))
+    seeking_venue = db.Column(db.Boolean, unique=False, default=False)
+    seeking_description = db.Column(db.Text)
+    shows = db.relationship("Show", backref="Artist")
+    past_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        trigram_index("Artist", "name"),
+        trigram_index("Artist", "city"),
+        db.Index("ix_Artist_musicGenres", "musicGenres", postgresql_using="gin"),
+    )
+
+
+class Show(db.Model):
+    __tablename__ = "Show"
+
+    id = db.Column(db.Integer, primary_key=True)
+    venue_id = db.Column(db.Integer, db.ForeignKey("Venue.id"))
+    artist_id = db.Column(db.Integer, db.ForeignKey("Artist.id"))
+    start_time = db.Column(db.DateTime(timezone=True))
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        db.Index("ix_Show_venue_id_start_time", "venue_id", "start_time"),
+        db.Index("ix_Show_artist_id_start_time", "artist_id", "start_time"),
+        db.Index("ix_Show_start_time_id", "start_time", "id"),
+    )
+
+    # TODO_DONE: implement any missing fields, as a database migration using Flask-Migrate
+
+
+class Genre(db.Model):
+    __tablename__ = "Genre"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, unique=True)
+
+
+def insert_default_genres(table, connection, **kw):
+    # migrations seed the table themselves; this covers create_all
+    connection.execute(table.insert(), [{"name": name} for name in DEFAULTS])
+
+
+event.listen(Genre.__table__, "after_create", insert_default_genres)
+
+
+# TODO_DONE Implement Show and Artist models, and complete all model relationships and properties, as a database migration.
+# ----------------------------------------------------------------------------#
+# Filters.
+# ----------------------------------------------------------------------------#
+
+
+def upcoming_shows_filter():
+    """SQL predicate for shows that have not started yet"""
+    return Show.start_time > func.now()
+
+
+def past_shows_filter():
+    """SQL predicate for shows that have already started"""
+    return Show.start_time <= func.now()
+
+
+def show_count(model, key, condition):
+    """Correlated count of the shows of each model row (joined on the Show
+    column key) that match condition, for use as a column"""
+    return (
+        select(func.count(Show.id))
+        .where(key == model.id, condition)
+        .scalar_subquery()
+    )
+
+
+# ----------------------------------------------------------------------------#
+# Show counters.
+# ----------------------------------------------------------------------------#
+
+
+def adjust_show_counters(show, step):
+    """Adds step to the past or upcoming counter of the show's venue and artist.
+    The show's start_time is compared to now() in SQL so naive form input is
+    judged exactly like the stored value"""
+    startTime = literal(show.start_time, Show.start_time.type)
+    upcoming = case((startTime > func.now(), step), else_=0)
+    past = case((startTime <= func.now(), step), else_=0)
+    for model, id in ((Venue, show.venue_id), (Artist, show.artist_id)):
+        model.query.filter_by(id=id).update(
+            {
+                model.upcoming_shows_count: model.upcoming_shows_count + upcoming,
+                model.past_shows_count: model.past_shows_count + past,
+            },
+            synchronize_session=False,
+        )
+
+
+def refresh_show_counters(model, key, ids=None):
+    """Recounts past/upcoming shows of model (Venue or Artist, joined on the
+    Show column key) from the Show table; only the given ids when passed"""
+    upcoming = show_count(model, key, upcoming_shows_filter())
+    past = show_count(model, key, past_shows_filter())
+    query = model.query
+    if ids is not None:
+        query = query.filter(model.id.in_(ids))
+    return query.update(
+        {model.upcoming_shows_count: upcoming, model.past_shows_count: past},
+        synchronize_session=False,
+    )
+
@@ -0,0 +1,132 @@
+"""Keyset (seek) pagination for listing pages.
+
+A page is addressed by an opaque cursor holding the sort key of the row at the
+page boundary. The next page is fetched with a WHERE on that key instead of an
+OFFSET, so page N is the same index range scan as page 1. The cursor also
+carries how many rows come before the boundary, which lets a listing stop
+after its first limit rows.
+
+Sort keys are (expression, descending) pairs whose last entry is unique (the
+primary key). Each expression must also be readable from a result row as
+``getattr(row, expression.key)``, so computed keys have to be labelled and
+selected.
+"""
+import base64
+import json
+from datetime import datetime
+
+from flask import abort, current_app
+from sqlalchemy import and_, false, or_
+
+
+class Page:
+    def __init__(self, items, page_size, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.page_size = page_size
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+def page_args(source):
+    """Reads cursor and page_size from request.args or request.form, clamping
+    page_size to the configured limits"""
+    size = source.get("page_size", type=int) or current_app.config["PAGE_SIZE"]
+    size = max(1, min(size, current_app.config["MAX_PAGE_SIZE"]))
+    return source.get("cursor") or None, size
+
+
+def encode_cursor(direction, values, offset=0):
+    values = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps([direction, values, offset], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, count):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direction, values, offset = json.loads(raw)
+        values = [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in values
+        ]
+    except (ValueError, TypeError, KeyError):
+        abort(400)
+    if direction not in ("next", "prev") or len(values) != count:
+        abort(400)
+    if type(offset) is not int or offset < 0:
+        abort(400)
+    return direction, values, offset
+
+
+def after(expression, value, descending):
+    """Rows strictly after value in this key's order. NULLs sort last going
+    up and first going down, so reversing the order mirrors them exactly."""
+    if descending:
+        return expression.isnot(None) if value is None else expression < value
+    return false() if value is None else or_(expression > value, expression.is_(None))
+
+
+def equal(expression, value):
+    return expression.is_(None) if value is None else expression == value
+
+
+def seek(keys, values, forward):
+    """Lexicographic "row comes after values" condition over mixed-direction keys"""
+    clauses = []
+    for index, (expression, descending) in enumerate(keys):
+        ties = [equal(keys[i][0], values[i]) for i in range(index)]
+        clauses.append(
+            and_(*ties, after(expression, values[index], descending != (not forward)))
+        )
+    return or_(*clauses)
+
+
+def ordering(keys, forward):
+    for expression, descending in keys:
+        if descending == forward:
+            yield expression.desc().nulls_first()
+        else:
+            yield expression.asc().nulls_last()
+
+
+def key_of(row, keys):
+    return [getattr(row, expression.key) for expression, descending in keys]
+
+
+def keyset_page(query, keys, cursor=None, page_size=20, limit=None):
+    """Returns the Page of query rows after (or before) cursor in keys order.
+    With limit, only the first limit rows can be paged through, and a cursor
+    past them is refused"""
+    forward = True
+    if cursor is not None:
+        direction, values, offset = decode_cursor(cursor, len(keys))
+        forward = direction == "next"
+        # a next cursor opens a page at row offset, a prev cursor ends one there
+        if limit is not None and (offset > limit or forward and offset == limit):
+            abort(400)
+        query = query.filter(seek(keys, values, forward))
+    rows = query.order_by(*ordering(keys, forward)).limit(page_size + 1).all()
+    more = len(rows) > page_size
+    items = rows[:page_size]
+    if not forward:
+        items.reverse()
+    if forward:
+        hasNext, hasPrev = more, cursor is not None
+        start = offset if cursor is not None else 0
+    else:
+        hasNext, hasPrev = True, more
+        start = max(offset - len(items), 0)
+    if limit is not None and start + len(items) >= limit:
+        del items[limit - start:]
+        hasNext = False
+    page = Page(items, page_size)
+    if items and hasNext:
+        page.next_cursor = encode_cursor(
+            "next", key_of(items[-1], keys), start + len(items)
+        )
+    if items and hasPrev:
+        page.prev_cursor = encode_cursor("prev", key_of(items[0], keys), start)
+    return page
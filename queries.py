@@ -0,0 +1,142 @@
+"""Queries and helpers shared by the venue, artist and show views."""
+from itertools import groupby
+from operator import attrgetter
+
+from flask import abort, current_app, jsonify, request, url_for
+from sqlalchemy import case, func
+
+from extensions import db
+from genres import catalog
+from models import Artist, Show, Venue, past_shows_filter, upcoming_shows_filter
+from search import genre_match
+
+# ----------------------------------------------------------------------------#
+# Queries.
+# ----------------------------------------------------------------------------#
+
+
+def show_listing():
+    """Returns a query of shows joined with their venue and artist in one statement"""
+    return (
+        db.session.query(
+            Show.id,
+            Show.venue_id,
+            Venue.name.label("venue_name"),
+            Show.artist_id,
+            Artist.name.label("artist_name"),
+            Artist.image_link.label("artist_image_link"),
+            Show.start_time,
+        )
+        .join(Venue, Show.venue_id == Venue.id)
+        .join(Artist, Show.artist_id == Artist.id)
+    )
+
+
+def area_order(model):
+    """Stable ordering that keeps each city/state area contiguous"""
+    return model.state, model.city, model.name, model.id
+
+
+def group_by_area(rows):
+    """Splits rows sorted with area_order into one list per city/state, in a
+    single pass; areas are produced as rows are read, so a streamed listing
+    only holds one area at a time"""
+    return (list(area) for _, area in groupby(rows, key=attrgetter("state", "city")))
+
+
+def venue_shows(venue_id):
+    """Shows at a venue joined with the artist columns the venue page renders"""
+    return (
+        db.session.query(
+            Show.id,
+            Show.artist_id,
+            Artist.name.label("artist_name"),
+            Artist.image_link.label("artist_image_link"),
+            Show.start_time,
+        )
+        .join(Artist, Show.artist_id == Artist.id)
+        .filter(Show.venue_id == venue_id)
+    )
+
+
+def artist_shows(artist_id):
+    """Shows of an artist joined with the venue columns the artist page renders"""
+    return (
+        db.session.query(
+            Show.id,
+            Show.venue_id,
+            Venue.name.label("venue_name"),
+            Venue.image_link.label("venue_image_link"),
+            Show.start_time,
+        )
+        .join(Venue, Show.venue_id == Venue.id)
+        .filter(Show.artist_id == artist_id)
+    )
+
+
+def split_shows(shows, limit):
+    """Returns (upcoming, past, past total) for a venue_shows/artist_shows query.
+    Only the latest limit past shows are loaded; the total comes from a
+    window count on the same statement"""
+    upcoming = shows.filter(upcoming_shows_filter()).order_by(Show.start_time).all()
+    past = (
+        shows.filter(past_shows_filter())
+        .add_columns(func.count().over().label("total"))
+        .order_by(Show.start_time.desc())
+        .limit(limit)
+        .all()
+    )
+    return upcoming, past, past[0].total if past else 0
+
+
+def show_partner_ids(key, partner, id):
+    """Distinct partner ids (e.g. Show.artist_id) of the shows where key == id"""
+    return [
+        partnerId
+        for (partnerId,) in db.session.query(partner).filter(key == id).distinct()
+    ]
+
+
+# ----------------------------------------------------------------------------#
+# Genres.
+# ----------------------------------------------------------------------------#
+
+
+def genre_counts(column):
+    """{genre: number of rows with it in column}, counted in one scan"""
+    names = catalog.names()
+    postgres = db.session.get_bind().dialect.name == "postgresql"
+    row = db.session.query(
+        *(func.count(case((genre_match(column, name, postgres), 1))) for name in names)
+    ).one()
+    return dict(zip(names, row))
+
+
+def genre_filter(query, column):
+    """Narrows query to rows with the ?genre= genre in column, if one is
+    given. Returns the query and the genre"""
+    genre = request.args.get("genre")
+    if not genre:
+        return query, None
+    genre = catalog.canonical(genre)
+    if genre is None:
+        abort(404)
+    postgres = db.session.get_bind().dialect.name == "postgresql"
+    return query.filter(genre_match(column, genre, postgres)), genre
+
+
+# ----------------------------------------------------------------------------#
+# Typeahead.
+# ----------------------------------------------------------------------------#
+
+
+def typeahead(index, endpoint, key):
+    """JSON suggestions for the ?q= prefix from index, linking to endpoint"""
+    limit = request.args.get("limit", current_app.config["TYPEAHEAD_LIMIT"], type=int)
+    matches = index.complete(request.args.get("q", ""), max(1, min(limit, 20)))
+    return jsonify(
+        data=[
+            {"id": id, "name": name, "url": url_for(endpoint, **{key: id})}
+            for id, name in matches
+        ]
+    )
@@ -0,0 +1,84 @@
+"""Venue and artist search.
+
+A search term matches on name, city or genre, and "City, ST" matches every
+record in that city and state. On PostgreSQL the ILIKE filters are answered by
+the pg_trgm GIN indexes and hits are ranked by trigram similarity. Other
+databases such as SQLite fall back to plain case-insensitive LIKE, ranking
+prefix matches first.
+"""
+from sqlalchemy import and_, case, cast, func, literal_column, or_, select, Float, String
+
+from genres import catalog
+
+
+def like_pattern(term, prefix=False):
+    """Escapes LIKE wildcards in term and wraps it for a substring (or prefix) match"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%" if prefix else "%" + escaped + "%"
+
+
+def is_postgres(query):
+    return query.session.get_bind().dialect.name == "postgresql"
+
+
+def genre_match(column, genre, postgres):
+    """Exact match of one genre inside an ARRAY (or JSON on SQLite) column"""
+    if postgres:
+        return column.contains([genre])
+    return cast(column, String).like('%"' + genre + '"%')
+
+
+def search_filter(model, genresColumn, term, postgres):
+    """Builds the WHERE clause for term against model"""
+    name = model.name.ilike(like_pattern(term), escape="\\")
+    if "," in term:
+        city, _, state = term.rpartition(",")
+        area = and_(
+            model.city.ilike(like_pattern(city.strip(), prefix=True), escape="\\"),
+            func.upper(model.state) == state.strip().upper(),
+        )
+        return or_(name, area)
+    clauses = [name, model.city.ilike(like_pattern(term), escape="\\")]
+    genre = catalog.canonical(term)
+    if genre is not None:
+        clauses.append(genre_match(genresColumn, genre, postgres))
+    return or_(*clauses)
+
+
+def search_rank(model, term, postgres):
+    """Sort key for hits, higher is better"""
+    if postgres:
+        # similarity() is a float4 whose text form is rounded; as float8 the
+        # value survives a round trip through a pagination cursor
+        return cast(
+            func.greatest(
+                func.similarity(model.name, term), func.similarity(model.city, term)
+            ),
+            Float,
+        )
+    return case(
+        (model.name.ilike(like_pattern(term, prefix=True), escape="\\"), 1),
+        else_=0,
+    )
+
+
+def search(query, model, genresColumn, term):
+    """Filters query (over model) by term, selecting the match score as "rank".
+    Returns the query and its sort keys, best matches first, for keyset_page"""
+    term = term.strip()
+    if not term:
+        return query, [(model.name, False), (model.id, False)]
+    postgres = is_postgres(query)
+    rank = search_rank(model, term, postgres).label("rank")
+    query = query.filter(search_filter(model, genresColumn, term, postgres))
+    return query.add_columns(rank), [(rank, True), (model.name, False), (model.id, False)]
+
+
+def match_count(query, limit=None):
+    """Uncorrelated scalar subquery counting the rows of query, stopping one
+    past limit so a broad term doesn't count the whole table. A count above
+    limit means there are more than limit matches"""
+    matches = query.order_by(None).with_entities(literal_column("1"))
+    if limit:
+        matches = matches.limit(limit + 1)
+    return select(func.count()).select_from(matches.subquery()).scalar_subquery()
@@ -0,0 +1,223 @@
+"""Server-side sessions.
+
+By default Flask keeps the whole session in a signed cookie. With
+SESSION_TYPE set to a store, the cookie only holds a random session id
+(signed with SECRET_KEY) and the data is kept server-side, so cookies stay
+small whatever is flashed. Reading a session is one lookup by id, and only
+for requests that send the cookie; it is written back only when it changed.
+
+Stores:
+    "cookie"      no store, Flask's signed cookie (default)
+    "filesystem"  one file per session in SESSION_DIR
+    "sqlite"      a table keyed by session id in SESSION_SQLITE_PATH
+
+Both stores can be shared by the workers of one host. Anything with the
+get/set/delete/purge methods below can be passed to init_app as the store.
+Expired sessions are ignored when read; ``flask fyyur purge-sessions``
+deletes them.
+"""
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{43}$")
+
+
+class FilesystemStore:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, sid):
+        return os.path.join(self.directory, sid)
+
+    def get(self, sid):
+        try:
+            with open(self.path(sid)) as file:
+                expires, _, data = file.read().partition("\n")
+        except FileNotFoundError:
+            return None
+        if float(expires) <= time.time():
+            return None
+        return data
+
+    def set(self, sid, data, expires):
+        # written aside and renamed, so readers never see half a session
+        partial = "%s.%d.tmp" % (self.path(sid), threading.get_ident())
+        with open(partial, "w") as file:
+            file.write("%f\n%s" % (expires, data))
+        os.replace(partial, self.path(sid))
+
+    def delete(self, sid):
+        try:
+            os.remove(self.path(sid))
+        except FileNotFoundError:
+            pass
+
+    def purge(self):
+        purged = 0
+        for name in os.listdir(self.directory):
+            if SESSION_ID.match(name) and self.get(name) is None:
+                self.delete(name)
+                purged += 1
+        return purged
+
+
+class SQLiteStore:
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self.connect()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions "
+            "(id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL) "
+            "WITHOUT ROWID"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_sessions_expires ON sessions (expires)"
+        )
+        connection.close()
+
+    def connect(self):
+        # WAL lets the workers read while one of them writes
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def connection(self):
+        # one connection per thread, opened in the process that uses it
+        connection = getattr(self.local, "connection", None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = self.local.connection = self.connect()
+            self.local.pid = os.getpid()
+        return connection
+
+    def get(self, sid):
+        row = self.connection().execute(
+            "SELECT data FROM sessions WHERE id = ? AND expires > ?",
+            (sid, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid, data, expires):
+        self.connection().execute(
+            "INSERT INTO sessions (id, data, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE "
+            "SET data = excluded.data, expires = excluded.expires",
+            (sid, data, expires),
+        )
+
+    def delete(self, sid):
+        self.connection().execute("DELETE FROM sessions WHERE id = ?", (sid,))
+
+    def purge(self):
+        return self.connection().execute(
+            "DELETE FROM sessions WHERE expires <= ?", (time.time(),)
+        ).rowcount
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class ServerSessionInterface(SessionInterface):
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store):
+        self.store = store
+
+    def signer(self, app):
+        return Signer(app.secret_key, salt="fyyur-session", key_derivation="hmac")
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self.signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid and SESSION_ID.match(sid):
+                data = self.store.get(sid)
+                if data is not None:
+                    return ServerSession(self.serializer.loads(data), sid)
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if session.accessed:
+            response.vary.add("Cookie")
+        if not (session.modified or session.new):
+            return
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        self.store.set(
+            session.sid, self.serializer.dumps(dict(session)), time.time() + lifetime
+        )
+        response.set_cookie(
+            name,
+            self.signer(app).sign(session.sid).decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+class ServerSessions:
+    def __init__(self, app=None, store=None):
+        self.store = None
+        if app is not None:
+            self.init_app(app, store)
+
+    def init_app(self, app, store=None):
+        if not app.config.get("SECRET_KEY"):
+            # a per-process random key would make each worker reject the
+            # sessions and CSRF tokens signed by the others
+            raise RuntimeError("SECRET_KEY is not set")
+        kind = app.config.get("SESSION_TYPE", "cookie")
+        if store is not None:
+            self.store = store
+        elif kind == "cookie":
+            self.store = None
+        elif kind == "filesystem":
+            self.store = FilesystemStore(app.config["SESSION_DIR"])
+        elif kind == "sqlite":
+            self.store = SQLiteStore(app.config["SESSION_SQLITE_PATH"])
+        else:
+            raise ValueError("Unknown SESSION_TYPE %r" % kind)
+        if self.store is not None:
+            app.session_interface = ServerSessionInterface(self.store)
+        app.extensions["sessions"] = self
+
+    def purge(self):
+        """Deletes expired sessions; returns how many, None without a store"""
+        if self.store is None:
+            return None
+        return self.store.purge()
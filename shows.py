@@ -0,0 +1,80 @@
+"""Show pages: the listing and the create form."""
+from flask import Blueprint, abort, flash, render_template, request
+
+from extensions import db, page_cache
+from filters import parse_datetime
+from models import Show, adjust_show_counters
+from pagination import keyset_page, page_args
+from queries import show_listing
+from streaming import stream_page, stream_rows, streaming
+
+blueprint = Blueprint("shows", __name__)
+
+
+#  Shows
+#  ----------------------------------------------------------------
+
+
+@blueprint.route("/shows")
+@page_cache.cached("shows", unless=streaming)
+def shows():
+    # displays list of shows at /shows
+    # TODO_DONE: replace with real venues data.
+    # rows already carry venue_name/artist_name/artist_image_link, so the
+    # template reads them directly instead of looking up each venue and artist
+    if streaming():
+        rows = stream_rows(show_listing().order_by(Show.start_time, Show.id))
+        return stream_page("pages/shows.html", shows=rows, page=None)
+    page = keyset_page(
+        show_listing(),
+        [(Show.start_time, False), (Show.id, False)],
+        *page_args(request.args),
+    )
+    return render_template("pages/shows.html", shows=page.items, page=page)
+
+
+@blueprint.route("/shows/create")
+def create_shows():
+    # renders form. do not touch.
+    from forms import ShowForm
+
+    form = ShowForm()
+    return render_template("forms/new_show.html", form=form)
+
+
+@blueprint.route("/shows/create", methods=["POST"])
+def create_show_submission():
+    # called to create new shows in the db, upon submitting new show listing form
+    # TODO_DONE: insert form data as a new Show record in the db, instead
+
+    error = False
+    form_data = request.form.to_dict()
+    try:
+        form_data["start_time"] = parse_datetime(form_data["start_time"])
+        show = Show(**form_data)
+        db.session.add(show)
+        adjust_show_counters(show, 1)
+        db.session.commit()
+        db.session.refresh(show)
+    except Exception as e:
+        print(e)
+        error = True
+        db.session.rollback()
+        flash("An error occurred. Show could not be listed.")
+    finally:
+        db.session.close()
+    if not error:
+        page_cache.invalidate("shows")
+        page_cache.invalidate("venues")
+        page_cache.invalidate("venue", form_data["venue_id"])
+        page_cache.invalidate("artist", form_data["artist_id"])
+        flash("Show was successfully listed!")
+    else:
+        abort(500)
+
+    # on successful db insert, flash success
+
+    # TODO_DONE: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Show could not be listed.')
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template("pages/home.html")
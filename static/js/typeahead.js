@@ -0,0 +1,108 @@
+/**
+ * @file
+ * Search box suggestions.
+ *
+ * Inputs with a data-typeahead URL ask it for names starting with what has
+ * been typed once typing pauses, and list them under the box. Picking one
+ * opens that page; Enter without a pick still submits the full search.
+ */
+(function () {
+  var DELAY = 150;
+  var MIN_LENGTH = 2;
+
+  function attach(input) {
+    var menu = document.createElement("ul");
+    var timer = null;
+    var pending = null;
+    var answers = {};
+    var active = -1;
+
+    menu.className = "dropdown-menu typeahead";
+    input.parentNode.appendChild(menu);
+
+    function close() {
+      menu.style.display = "none";
+      active = -1;
+    }
+
+    function show(items) {
+      menu.innerHTML = "";
+      items.forEach(function (item) {
+        var entry = document.createElement("li");
+        var link = document.createElement("a");
+        link.href = item.url;
+        link.textContent = item.name;
+        entry.appendChild(link);
+        menu.appendChild(entry);
+      });
+      active = -1;
+      menu.style.display = items.length ? "block" : "none";
+    }
+
+    function lookup() {
+      var term = input.value.trim();
+      if (term.length < MIN_LENGTH) {
+        close();
+        return;
+      }
+      if (answers[term]) {
+        show(answers[term]);
+        return;
+      }
+      // only the latest keystroke's answer matters
+      if (pending) {
+        pending.abort();
+      }
+      pending = new AbortController();
+      fetch(input.dataset.typeahead + "?q=" + encodeURIComponent(term), {
+        signal: pending.signal,
+      })
+        .then(function (response) {
+          return response.json();
+        })
+        .then(function (body) {
+          answers[term] = body.data;
+          if (input.value.trim() === term) {
+            show(body.data);
+          }
+        })
+        .catch(function () {});
+    }
+
+    function move(step) {
+      var entries = menu.children;
+      if (!entries.length) {
+        return;
+      }
+      if (active >= 0) {
+        entries[active].classList.remove("active");
+      }
+      active = Math.max(-1, Math.min(entries.length - 1, active + step));
+      if (active >= 0) {
+        entries[active].classList.add("active");
+      }
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(lookup, DELAY);
+    });
+    input.addEventListener("keydown", function (event) {
+      if (event.key === "ArrowDown" || event.key === "ArrowUp") {
+        event.preventDefault();
+        move(event.key === "ArrowDown" ? 1 : -1);
+      } else if (event.key === "Enter" && active >= 0) {
+        event.preventDefault();
+        window.location = menu.children[active].firstChild.href;
+      } else if (event.key === "Escape") {
+        close();
+      }
+    });
+    // late enough for a click on a suggestion to land first
+    input.addEventListener("blur", function () {
+      setTimeout(close, 200);
+    });
+  }
+
+  document.querySelectorAll("input[data-typeahead]").forEach(attach);
+})();
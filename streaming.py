@@ -0,0 +1,52 @@
+"""Streamed listing pages.
+
+With LISTING_STREAM on, /venues, /artists and /shows list every matching
+record on one page instead of a page of PAGE_SIZE. The rows are read with
+yield_per, so PostgreSQL hands them over from a server-side cursor
+STREAM_CHUNK_ROWS at a time, and the template is rendered with
+stream_template, which sends the HTML out in STREAM_BUFFER_SIZE pieces as
+the rows arrive. The first byte leaves after the first chunk of rows and the
+process holds about one chunk, however large the catalog is.
+
+Streamed pages skip the page cache. Their statements run after the request's
+SQL totals have been recorded, so those leave them out. A request with flash
+messages pending is rendered in one piece, as the session has already been
+saved by the time a streamed body shows them.
+"""
+from flask import Response, current_app, session, stream_template
+
+
+def streaming():
+    # the session is saved before a streamed body is rendered, so flashes
+    # shown in it would never be cleared: those requests render in one piece
+    return current_app.config["LISTING_STREAM"] and not session.get("_flashes")
+
+
+def stream_rows(query):
+    """Iterates query's rows STREAM_CHUNK_ROWS at a time"""
+    return query.yield_per(current_app.config["STREAM_CHUNK_ROWS"])
+
+
+def buffered(chunks, size):
+    """Joins the many small pieces a template yields into pieces of about
+    size characters, so each write to the client is worth making"""
+    pending, length = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(pending)
+            pending, length = [], 0
+    if pending:
+        yield "".join(pending)
+
+
+def stream_page(template, **context):
+    chunks = stream_template(template, **context)
+    response = Response(
+        buffered(chunks, current_app.config["STREAM_BUFFER_SIZE"]),
+        mimetype="text/html",
+    )
+    # proxies such as nginx would otherwise hold the page until it is complete
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
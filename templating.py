@@ -0,0 +1,45 @@
+"""Compiled templates shared by the workers.
+
+Jinja compiles a template to Python the first time a process renders it,
+which each new worker pays for on its first requests after a deploy or a
+recycle. With TEMPLATE_CACHE_DIR set, the compiled code is kept in that
+directory and reused by every worker of the host. Entries are checked against
+the template source, so an edited template is compiled again rather than
+served stale. ``flask fyyur precompile-templates`` fills the cache at deploy
+time, before the workers start.
+"""
+import os
+import threading
+
+from jinja2 import FileSystemBytecodeCache
+
+
+class SharedBytecodeCache(FileSystemBytecodeCache):
+    def dump_bytecode(self, bucket):
+        # written aside and renamed, so other workers never load half a file
+        path = self._get_cache_filename(bucket)
+        partial = "%s.%d.%d.tmp" % (path, os.getpid(), threading.get_ident())
+        with open(partial, "wb") as file:
+            bucket.write_bytecode(file)
+        os.replace(partial, path)
+
+
+def init_template_cache(app):
+    """Gives the app's Jinja environment the bytecode cache; call before
+    anything uses app.jinja_env"""
+    directory = app.config.get("TEMPLATE_CACHE_DIR")
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    cache = SharedBytecodeCache(directory)
+    app.jinja_options = dict(app.jinja_options, bytecode_cache=cache)
+    return cache
+
+
+def precompile(app):
+    """Compiles every .html template of the app and its blueprints into the
+    bytecode cache; returns their names"""
+    names = app.jinja_env.list_templates(filter_func=lambda name: name.endswith(".html"))
+    for name in names:
+        app.jinja_env.get_template(name)
+    return names
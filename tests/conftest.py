@@ -0,0 +1,53 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+
+# the tests create and drop tables, so they get a throwaway in-memory
+# database, whatever DATABASE_URL the shell has; compiled templates and the
+# log stay out of the checkout
+os.environ["FYYUR_ENV"] = "testing"
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["TEMPLATE_CACHE_DIR"] = ""
+os.environ.setdefault(
+    "LOG_FILE", os.path.join(tempfile.mkdtemp(prefix="fyyur-tests-"), "error.log")
+)
+
+import pytest
+
+from app import create_app
+from extensions import db
+from models import Artist, Show, Venue
+
+
+@pytest.fixture(scope="session")
+def fyyur():
+    return create_app()
+
+
+@pytest.fixture
+def app(fyyur):
+    with fyyur.app_context():
+        db.create_all()
+        yield fyyur
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def add_shows(app):
+    """Adds count shows, each at a venue and by an artist of its own"""
+
+    def add_shows(count):
+        for _ in range(count):
+            venue = Venue(name="Venue", city="City", state="CA", genres=["Jazz"])
+            artist = Artist(name="Artist", city="City", state="CA", musicGenres=["Jazz"])
+            startTime = datetime(2030, 1, 1, 20, tzinfo=timezone.utc)
+            db.session.add(Show(Venue=venue, Artist=artist, start_time=startTime))
+        db.session.commit()
+
+    return add_shows
@@ -0,0 +1,54 @@
+import pytest
+
+from extensions import db
+from models import Venue
+
+
+@pytest.mark.parametrize(
+    "path", ["/api/v1/venues", "/api/v1/venues/1", "/api/v1/shows", "/api/v1/shows/1"]
+)
+def test_unknown_field_is_a_bad_request(client, add_shows, path):
+    add_shows(1)
+    response = client.get(path, query_string={"fields": "name,nope"})
+    assert response.status_code == 400
+
+
+def test_fields_selects_the_output(client, add_shows):
+    add_shows(2)
+    page = client.get("/api/v1/venues", query_string={"fields": "name"}).get_json()
+    assert [sorted(venue) for venue in page["data"]] == [["name"], ["name"]]
+
+
+@pytest.mark.parametrize(
+    "path", ["/api/v1/venues/1", "/api/v1/artists/1", "/api/v1/shows/1"]
+)
+def test_detail_answers_conditional_requests(client, add_shows, path):
+    add_shows(1)
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers["ETag"] and response.headers["Last-Modified"]
+    again = client.get(path, headers={"If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304 and again.get_data() == b""
+    again = client.get(
+        path, headers={"If-Modified-Since": response.headers["Last-Modified"]}
+    )
+    assert again.status_code == 304
+
+
+def test_detail_etag_changes_with_the_record(client, add_shows):
+    add_shows(1)
+    etag = client.get("/api/v1/venues/1").headers["ETag"]
+    db.session.get(Venue, 1).name = "Renamed"
+    db.session.commit()
+    response = client.get("/api/v1/venues/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["name"] == "Renamed"
+
+
+def test_list_has_an_etag_but_no_last_modified(client, add_shows):
+    add_shows(1)
+    response = client.get("/api/v1/shows")
+    assert "ETag" in response.headers and "Last-Modified" not in response.headers
+    etag = response.headers["ETag"]
+    again = client.get("/api/v1/shows", headers={"If-None-Match": etag})
+    assert again.status_code == 304
@@ -0,0 +1,19 @@
+from cache import MemoryBackend
+
+
+def test_memory_generations_are_bounded():
+    backend = MemoryBackend(max_entries=3)
+    for venue in range(100):
+        backend.bump("venue:%d" % venue)
+    assert len(backend.generations) == 3
+
+
+def test_evicted_generation_is_not_reused():
+    backend = MemoryBackend(max_entries=2)
+    before = backend.generation("venue:1")
+    backend.bump("venue:2")
+    backend.bump("venue:3")
+    # venue:1's number was evicted: reading it again must not bring back
+    # the pages stored under the old one
+    assert "venue:1" not in backend.generations
+    assert backend.generation("venue:1") > before
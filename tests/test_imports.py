@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.import_time import LAZY, ROOT, parse
+
+
+def test_startup_leaves_lazy_modules_unimported():
+    # a fresh interpreter: the test process has imported everything by now
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app; app.create_app()"],
+        cwd=ROOT,
+        env=dict(os.environ),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    _, imported = parse(result.stderr)
+    assert imported
+    assert sorted({name.split(".")[0] for name in imported} & set(LAZY)) == []
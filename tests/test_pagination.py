@@ -0,0 +1,48 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from pagination import encode_cursor
+
+
+def raw_cursor(value):
+    raw = json.dumps(value).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        raw_cursor("next"),
+        raw_cursor(["sideways", [1], 0]),
+        # the /shows keys are (start_time, id): one value is too few
+        raw_cursor(["next", [1], 0]),
+        raw_cursor(["next", [{"dt": "not a date"}, 1], 0]),
+        raw_cursor(["next", [{"dt": "2030-01-01T20:00:00"}, 1], -1]),
+    ],
+)
+def test_malformed_cursor_is_a_bad_request(client, add_shows, cursor):
+    add_shows(1)
+    assert client.get("/shows", query_string={"cursor": cursor}).status_code == 400
+
+
+def test_cursors_page_through_every_show_once(client, add_shows):
+    add_shows(5)
+    seen, cursor = [], None
+    while True:
+        query = {"page_size": 2, "cursor": cursor} if cursor else {"page_size": 2}
+        page = client.get("/api/v1/shows", query_string=query).get_json()
+        seen += [show["id"] for show in page["data"]]
+        cursor = page["next"]
+        if cursor is None:
+            break
+    assert sorted(seen) == [1, 2, 3, 4, 5] and len(seen) == 5
+
+
+def test_cursor_round_trips_datetimes(client, add_shows):
+    add_shows(2)
+    cursor = encode_cursor("next", [datetime(2030, 1, 1, 20), 1])
+    assert client.get("/shows", query_string={"cursor": cursor}).status_code == 200
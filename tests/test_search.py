@@ -0,0 +1,72 @@
+import re
+
+from extensions import db
+from models import Venue
+from pagination import encode_cursor
+from search import like_pattern
+
+
+def search(client, **form):
+    """Venue ids listed by a search, and the count and next cursor it shows"""
+    response = client.post("/venues/search", data=form)
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    ids = [int(id) for id in re.findall(r'<a href="/venues/(\d+)">', body)]
+    count = re.search(r'Number of search results for "[^"]*": ([\d+]+)', body).group(1)
+    cursor = re.search(
+        r'class="next">\s*<form[^>]*>\s*<input[^>]*>\s*'
+        r'<input type="hidden" name="cursor" value="([^"]+)"',
+        body,
+    )
+    return ids, count, cursor and cursor.group(1)
+
+
+def add_venues(*names):
+    venues = [Venue(name=name, city="City", state="CA", genres=[]) for name in names]
+    db.session.add_all(venues)
+    db.session.commit()
+    return {venue.name: venue.id for venue in venues}
+
+
+def test_like_pattern_escapes_wildcards():
+    assert like_pattern("100%") == "%100\\%%"
+    assert like_pattern("a_b") == "%a\\_b%"
+    assert like_pattern("back\\slash") == "%back\\\\slash%"
+    assert like_pattern("hall", prefix=True) == "hall%"
+
+
+def test_wildcards_in_the_term_match_literally(client):
+    ids = add_venues("100% Jazz", "1000 Jazz", "Under_score", "Underscore")
+    assert search(client, search_term="100%")[0] == [ids["100% Jazz"]]
+    assert search(client, search_term="r_s")[0] == [ids["Under_score"]]
+
+
+def test_sqlite_ranks_prefix_matches_first(client):
+    ids = add_venues("Alpha Hall", "Hall Beta", "Town hall", "Hallway")
+    found, count, cursor = search(client, search_term="hall")
+    # prefix matches first, then the rest, each by name
+    names = ["Hall Beta", "Hallway", "Alpha Hall", "Town hall"]
+    assert found == [ids[name] for name in names]
+    assert count == "4"
+
+
+def test_search_results_stop_at_the_limit(app, client, add_shows, monkeypatch):
+    monkeypatch.setitem(app.config, "SEARCH_RESULT_LIMIT", 3)
+    add_shows(5)
+    ids, count, cursor = search(client, search_term="Venue", page_size=2)
+    assert len(ids) == 2 and count == "3+"
+    more, count, cursor = search(
+        client, search_term="Venue", page_size=2, cursor=cursor
+    )
+    assert len(more) == 1 and cursor is None and count == "3+"
+    # a cursor past the limit, made by hand, is refused
+    past = encode_cursor("next", [1, "Venue", more[-1]], 3)
+    response = client.post("/venues/search", data={"search_term": "Venue", "cursor": past})
+    assert response.status_code == 400
+
+
+def test_search_under_the_limit_counts_exactly(app, client, add_shows, monkeypatch):
+    monkeypatch.setitem(app.config, "SEARCH_RESULT_LIMIT", 3)
+    add_shows(3)
+    ids, count, cursor = search(client, search_term="Venue")
+    assert len(ids) == 3 and count == "3" and cursor is None
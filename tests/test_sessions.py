@@ -0,0 +1,40 @@
+import pytest
+from flask import Flask, session
+
+from sessions import ServerSessions
+
+
+def session_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    ServerSessions(app)
+
+    @app.route("/set/<value>")
+    def set_value(value):
+        session["value"] = value
+        return ""
+
+    @app.route("/get")
+    def get_value():
+        return session.get("value", "")
+
+    return app
+
+
+@pytest.mark.parametrize("key", [None, ""])
+def test_init_app_requires_a_secret_key(key):
+    with pytest.raises(RuntimeError, match="SECRET_KEY"):
+        session_app(SECRET_KEY=key)
+
+
+def test_sqlite_store_keeps_the_data_server_side(tmp_path):
+    app = session_app(
+        SECRET_KEY="test",
+        SESSION_TYPE="sqlite",
+        SESSION_SQLITE_PATH=str(tmp_path / "sessions.db"),
+    )
+    client = app.test_client()
+    response = client.get("/set/" + "x" * 5000)
+    # only the signed session id travels, however big the session
+    assert len(response.headers["Set-Cookie"]) < 200
+    assert client.get("/get").get_data(as_text=True) == "x" * 5000
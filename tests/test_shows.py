@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def statements(client, path):
+    """SQL statements run while serving path, body included"""
+    count = {"statements": 0}
+
+    def counter(*args):
+        count["statements"] += 1
+
+    event.listen(Engine, "before_cursor_execute", counter)
+    try:
+        response = client.get(path)
+        response.get_data()
+    finally:
+        event.remove(Engine, "before_cursor_execute", counter)
+    assert response.status_code == 200
+    return count["statements"]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_show_listing_queries_do_not_grow_with_shows(app, client, add_shows, monkeypatch, stream):
+    # one joined query for the rows: a lookup per show, venue or artist
+    # would make the longer listing cost more statements
+    monkeypatch.setitem(app.config, "LISTING_STREAM", stream)
+    add_shows(3)
+    client.get("/shows").get_data()
+    few = statements(client, "/shows")
+    add_shows(17)
+    assert statements(client, "/shows") == few
@@ -0,0 +1,130 @@
+"""In-memory name index for the search box typeahead.
+
+Each process keeps the names of every venue (or artist) in two sorted lists:
+the whole name, and the name from each later word on, all casefolded. A
+prefix lookup is a binary search plus a short scan, so answering it doesn't
+touch the database. Matches on the start of the name come before matches on
+a later word ("blue" finds "Blue Fox 3", then "The Blue Room 12").
+
+The routes that create, edit and delete records update the index of their
+own process. Other workers, and bulk imports, are picked up when the index
+is older than max_age seconds and is reloaded from the database.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+
+
+def fold(text):
+    return " ".join(text.casefold().split())
+
+
+def name_keys(name):
+    """(whole name, name from each later word on) index keys for name"""
+    words = fold(name).split(" ")
+    return " ".join(words), [" ".join(words[i:]) for i in range(1, len(words))]
+
+
+class NameIndex:
+    def __init__(self, loader, max_age=300):
+        # loader returns the (id, name) rows to index
+        self.loader = loader
+        self.max_age = max_age
+        self.names = {}
+        self.starts = []
+        self.words = []
+        self.loaded = None
+        self.pending = None
+        self.lock = threading.Lock()
+        self.loading = threading.Lock()
+
+    def reload(self):
+        with self.lock:
+            # changes made while the rows are read are replayed on top
+            self.pending = []
+        try:
+            names = {id: name for id, name in self.loader() if name}
+        except Exception:
+            with self.lock:
+                self.pending = None
+            raise
+        starts, words = [], []
+        for id, name in names.items():
+            start, later = name_keys(name)
+            starts.append((start, id))
+            words.extend((key, id) for key in later)
+        starts.sort()
+        words.sort()
+        with self.lock:
+            self.names, self.starts, self.words = names, starts, words
+            changes, self.pending = self.pending, None
+            for change in changes:
+                change()
+            self.loaded = time.monotonic()
+
+    def refresh(self):
+        """Loads the index on first use and again once it is max_age old"""
+        loaded = self.loaded
+        if loaded is not None and time.monotonic() - loaded < self.max_age:
+            return
+        # the first load makes everyone wait; a reload is left to one thread
+        # while the others keep answering from the current index
+        if not self.loading.acquire(blocking=loaded is None):
+            return
+        try:
+            if self.loaded is loaded:
+                self.reload()
+        finally:
+            self.loading.release()
+
+    def _remove(self, id):
+        name = self.names.pop(id, None)
+        if name is None:
+            return
+        start, later = name_keys(name)
+        for entries, key in [(self.starts, start)] + [(self.words, key) for key in later]:
+            position = bisect_left(entries, (key, id))
+            if position < len(entries) and entries[position] == (key, id):
+                del entries[position]
+
+    def _put(self, id, name):
+        self._remove(id)
+        if not name:
+            return
+        self.names[id] = name
+        start, later = name_keys(name)
+        insort(self.starts, (start, id))
+        for key in later:
+            insort(self.words, (key, id))
+
+    def put(self, id, name):
+        """Adds or renames record id"""
+        with self.lock:
+            self._put(id, name)
+            if self.pending is not None:
+                self.pending.append(lambda: self._put(id, name))
+
+    def remove(self, id):
+        with self.lock:
+            self._remove(id)
+            if self.pending is not None:
+                self.pending.append(lambda: self._remove(id))
+
+    def complete(self, prefix, limit=8):
+        """(id, name) of up to limit records with a name or word starting
+        with prefix"""
+        prefix = fold(prefix)
+        if not prefix:
+            return []
+        self.refresh()
+        ids = {}
+        with self.lock:
+            for entries in (self.starts, self.words):
+                position = bisect_left(entries, (prefix,))
+                while len(ids) < limit and position < len(entries):
+                    key, id = entries[position]
+                    if not key.startswith(prefix):
+                        break
+                    ids[id] = self.names[id]
+                    position += 1
+        return list(ids.items())
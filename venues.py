@@ -0,0 +1,300 @@
+"""Venue pages: listing, search, detail and the create/edit/delete forms."""
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+
+from extensions import db, page_cache
+from genres import catalog
+from models import (
+    Artist,
+    Show,
+    Venue,
+    refresh_show_counters,
+    show_count,
+    upcoming_shows_filter,
+)
+from pagination import keyset_page, page_args
+from queries import (
+    area_order,
+    genre_filter,
+    group_by_area,
+    show_partner_ids,
+    split_shows,
+    typeahead,
+    venue_shows,
+)
+from search import match_count, search
+from streaming import stream_page, stream_rows, streaming
+from typeahead import NameIndex
+
+blueprint = Blueprint("venues", __name__)
+
+venue_names = NameIndex(lambda: db.session.query(Venue.id, Venue.name))
+
+
+@blueprint.record_once
+def configure(state):
+    venue_names.max_age = state.app.config["TYPEAHEAD_MAX_AGE"]
+
+
+#  Venues
+#  ----------------------------------------------------------------
+
+
+@blueprint.route("/venues")
+@page_cache.cached("venues", unless=streaming)
+def venues():
+
+    def mappingVenues(venue):
+        return {
+            "id": venue.id,
+            "name": venue.name,
+            "num_upcoming_shows": venue.upcoming_shows_count,
+        }
+
+    def mappingArea(area):
+        return {
+            "city": area[0].city,
+            "state": area[0].state,
+            "venues": list(map(mappingVenues, area)),
+        }
+
+    venues, genre = genre_filter(
+        db.session.query(
+            Venue.id, Venue.name, Venue.city, Venue.state, Venue.upcoming_shows_count
+        ),
+        Venue.genres,
+    )
+    genreCounts = catalog.counts("venues")
+    if streaming():
+        rows = stream_rows(venues.order_by(*area_order(Venue)))
+        return stream_page(
+            "pages/venues.html",
+            areas=map(mappingArea, group_by_area(rows)),
+            page=None,
+            genre=genre,
+            genre_counts=genreCounts,
+        )
+    keys = [(column, False) for column in area_order(Venue)]
+    page = keyset_page(venues, keys, *page_args(request.args))
+    areas = map(mappingArea, group_by_area(page.items))
+
+    return render_template(
+        "pages/venues.html",
+        areas=areas,
+        page=page,
+        genre=genre,
+        genre_counts=genreCounts,
+    )
+
+
+@blueprint.route("/venues/search", methods=["POST"])
+def search_venues():
+    # TODO_DONE: implement search on artists with partial string search. Ensure it is case-insensitive.
+    # seach for Hop should return "The Musical Hop".
+    # search for "Music" should return "The Musical Hop" and "Park Square Live Music & Coffee"
+    class VenueSearch:
+      def __init__(self, count, capped, data):
+          self.count = count
+          self.capped = capped
+          self.data = data
+    class VenueSearchData:
+      def __init__(self, id, name, num_upcoming_shows):
+          self.id = id
+          self.name = name
+          self.num_upcoming_shows = num_upcoming_shows
+    def mapSearchVenue(venue):
+      return VenueSearchData(venue.id, venue.name, venue.num_upcoming_shows)
+
+    searchTerm = request.form.get("search_term", "")
+    venues, keys = search(
+        db.session.query(
+            Venue.id,
+            Venue.name,
+            show_count(Venue, Show.venue_id, upcoming_shows_filter()).label(
+                "num_upcoming_shows"
+            ),
+        ),
+        Venue,
+        Venue.genres,
+        searchTerm,
+    )
+    limit = current_app.config["SEARCH_RESULT_LIMIT"]
+    total = match_count(venues, limit).label("total")
+    page = keyset_page(
+        venues.add_columns(total), keys, *page_args(request.form), limit=limit
+    )
+    venues = page.items
+    count = venues[0].total if venues else 0
+    response = VenueSearch(
+        min(count, limit), count > limit, list(map(mapSearchVenue, venues))
+    )
+
+    return render_template(
+        "pages/search_venues.html", results=response, search_term=searchTerm, page=page
+    )
+
+
+@blueprint.route("/venues/typeahead")
+def typeahead_venues():
+    return typeahead(venue_names, ".show_venue", "venue_id")
+
+
+@blueprint.route("/venues/<int:venue_id>")
+@page_cache.cached("venue", "venue_id")
+def show_venue(venue_id):
+    # shows the venue page with the given venue_id
+    # TODO_DONE: replace with real venue data from the venues table, using venue_id
+    data = Venue.query.get_or_404(venue_id)
+    upcomingShow, pastShow, pastShowCount = split_shows(
+        venue_shows(venue_id), current_app.config["PAST_SHOWS_LIMIT"]
+    )
+    data = {
+        **data.__dict__,
+        "past_shows_count": pastShowCount,
+        "upcoming_shows_count": upcomingShow.__len__(),
+        "past_shows": pastShow,
+        "upcoming_shows": upcomingShow,
+    }
+
+    return render_template("pages/show_venue.html", venue=data)
+
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@blueprint.route("/venues/create", methods=["GET"])
+def create_venue_form():
+    from forms import VenueForm
+
+    form = VenueForm()
+    return render_template("forms/new_venue.html", form=form)
+
+
+@blueprint.route("/venues/create", methods=["POST"])
+def create_venue_submission():
+    # TODO_DONE: insert form data as a new Venue record in the db, instead
+    # TODO_DONE: modify data to be the data object returned from db insertion
+
+    error = False
+    form_data = request.form.to_dict()
+    try:
+        if "seeking_talent" in form_data.keys():
+            form_data["seeking_talent"] = (
+                True if form_data["seeking_talent"] == "y" else False
+            )
+        form_data["genres"] = request.form.getlist("genres")
+        venue = Venue(**form_data)
+        db.session.add(venue)
+        db.session.commit()
+        db.session.refresh(venue)
+    except:
+        error = True
+        db.session.rollback()
+        flash("An error occurred. Venue " + form_data["name"] + " could not be listed.")
+    finally:
+        db.session.close()
+    if not error:
+        page_cache.invalidate("venues")
+        catalog.invalidate("venues")
+        venue_names.put(venue.id, venue.name)
+        flash("Venue " + form_data["name"] + " was successfully listed!")
+    else:
+        abort(500)
+
+    # on successful db insert, flash success
+
+    # TODO_DONE: on unsuccessful db insert, flash an error instead.
+    # e.g., flash('An error occurred. Venue ' + data.name + ' could not be listed.')
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template("pages/home.html")
+
+
+@blueprint.route("/venues/<venue_id>", methods=["DELETE"])
+def delete_venue(venue_id):
+    try:
+        # the venue's shows go with it, so the artists that played there
+        # are recounted once the shows are gone
+        shows = Show.query.filter_by(venue_id=venue_id)
+        artistIds = [id for (id,) in shows.with_entities(Show.artist_id).distinct()]
+        shows.delete(synchronize_session=False)
+        refresh_show_counters(Artist, Show.artist_id, artistIds)
+        Venue.query.filter_by(id=venue_id).delete()
+        db.session.commit()
+        page_cache.invalidate("venues")
+        page_cache.invalidate("shows")
+        page_cache.invalidate("venue", venue_id)
+        page_cache.invalidate("artist", *artistIds)
+        catalog.invalidate("venues")
+        venue_names.remove(int(venue_id))
+    except:
+        db.session.rollback()
+    finally:
+        db.session.close()
+    # TODO_DONE: Complete this endpoint for taking a venue_id, and using
+    # SQLAlchemy ORM to delete a record. Handle cases where the session commit could fail.
+
+    # BONUS CHALLENGE: Implement a button to delete a Venue on a Venue Page, have it so that
+    # clicking that button delete it from the db then redirect the user to the homepage
+    return redirect(url_for(".venues"))
+
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@blueprint.route("/venues/<int:venue_id>/edit", methods=["GET"])
+def edit_venue(venue_id):
+    from forms import VenueForm
+
+    venue = Venue.query.get(venue_id)
+    form = VenueForm(**venue.__dict__)
+    # TODO_DONE: populate form with values from venue with ID <venue_id>
+    return render_template("forms/edit_venue.html", form=form, venue=venue)
+
+
+@blueprint.route("/venues/<int:venue_id>/edit", methods=["POST"])
+def edit_venue_submission(venue_id):
+    # TODO_DONE: take values from the form submitted, and update existing
+    # venue record with ID <venue_id> using the new attributes
+    from forms import VenueForm
+
+    error = False
+    form_data = request.form.to_dict()
+    venue = Venue.query.get(venue_id)
+    try:
+        if "seeking_talent" in form_data.keys():
+            form_data["seeking_talent"] = (
+                True if form_data["seeking_talent"] == "y" else False
+            )
+        else:
+            form_data = {**form_data, "seeking_talent": False}
+        form_data["genres"] = request.form.getlist("genres")
+        form = VenueForm(**form_data)
+        form.populate_obj(venue)
+        db.session.commit()
+        db.session.refresh(venue)
+    except:
+        error = True
+        db.session.rollback()
+        flash("An error occurred. Venue " + form_data["name"] + " could not be listed.")
+    finally:
+        db.session.close()
+    if error:
+        abort(500)
+    # the venue's name and image also appear on /shows and its artists' pages
+    page_cache.invalidate("venues")
+    page_cache.invalidate("shows")
+    page_cache.invalidate("venue", venue_id)
+    page_cache.invalidate("artist", *show_partner_ids(Show.venue_id, Show.artist_id, venue_id))
+    catalog.invalidate("venues")
+    venue_names.put(venue_id, venue.name)
+    return redirect(url_for(".show_venue", venue_id=venue_id))
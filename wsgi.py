@@ -0,0 +1,18 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+    uvicorn --interface wsgi --workers 4 wsgi:app
+
+Settings come from the "production" profile unless FYYUR_ENV names another,
+so the debugger and template auto-reload are off and SECRET_KEY must be set.
+``python app.py`` is still the development launcher.
+"""
+import os
+
+os.environ.setdefault("FYYUR_ENV", "production")
+
+from app import create_app
+
+app = create_app()
+
+application = app